@@ -0,0 +1,193 @@
+# aggregates.py
+
+import datetime
+import math
+from collections import Counter
+
+def record_day(value):
+    """Returns the date of a 'YYYY-MM-DD...' string (or a date), or None if it has none."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+def week_start(day):
+    """Returns the Monday of the week a date falls in."""
+    return day - datetime.timedelta(days=day.weekday())
+
+def _number(value):
+    """Returns a rating as a float, or None if it isn't a number."""
+    if isinstance(value, bool):
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+def _bump(counter, key, delta):
+    """Adds delta to a Counter entry, dropping entries that fall to zero."""
+    value = counter[key] + delta
+    if value:
+        counter[key] = value
+    else:
+        del counter[key]
+
+
+class CollectionStats:
+    """
+    Running aggregates of one collection, kept up to date as records change.
+
+    add(record) and remove(record) each cost O(1) (O(fields) for the per-emotion figures), and
+    remove exactly undoes add, so an update is remove(old record) + add(new record). The base
+    class counts records in total, per day and per week (weeks start on Monday); the subclasses
+    below add the figures of their record type. Building one from all records gives the same
+    numbers, which is how DataManager.verify_statistics checks them.
+    """
+    def __init__(self, date_field, records=()):
+        self.date_field = date_field
+        self.version = 0 # Bumped on every change, so views can tell when they are stale
+        self.count = 0
+        self.per_day = Counter() # 'YYYY-MM-DD' -> number of records
+        self.per_week = Counter() # 'YYYY-MM-DD' of the Monday -> number of records
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        self.version += 1
+        self._apply(record, 1)
+
+    def remove(self, record):
+        self.version += 1
+        self._apply(record, -1)
+
+    def _apply(self, record, sign):
+        self.count += sign
+        day = record_day(record.get(self.date_field))
+        if day is not None:
+            _bump(self.per_day, day.isoformat(), sign)
+            _bump(self.per_week, week_start(day).isoformat(), sign)
+
+    def count_on(self, day):
+        """Number of records dated on `day`."""
+        return self.per_day.get(day.isoformat(), 0)
+
+    def count_in_week(self, day):
+        """Number of records dated in the week (Monday to Sunday) containing `day`."""
+        return self.per_week.get(week_start(day).isoformat(), 0)
+
+    def _state(self):
+        """The aggregates as comparable values: (exact values, float sums)."""
+        return (self.count, self.per_day, self.per_week), ()
+
+    def matches(self, other):
+        """Checks whether two stats hold the same numbers (float sums compared with a small tolerance)."""
+        exact, sums = self._state()
+        other_exact, other_sums = other._state()
+        return exact == other_exact and len(sums) == len(other_sums) and \
+            all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9) for a, b in zip(sums, other_sums))
+
+
+class ActivityStats(CollectionStats):
+    """Adds the mean actual-minus-predicted pleasure and mastery of behavioral activation activities."""
+    # gap name -> (predicted field, actual field)
+    GAPS = {
+        "pleasure": ("Predicted Pleasure", "Actual Pleasure"),
+        "mastery": ("Predicted Mastery", "Actual Mastery"),
+    }
+
+    def __init__(self, date_field, records=()):
+        self.gap_sums = dict.fromkeys(self.GAPS, 0.0)
+        self.gap_counts = dict.fromkeys(self.GAPS, 0) # Activities with both ratings
+        super().__init__(date_field, records)
+
+    def _apply(self, record, sign):
+        super()._apply(record, sign)
+        for gap, (predicted_field, actual_field) in self.GAPS.items():
+            predicted, actual = _number(record.get(predicted_field)), _number(record.get(actual_field))
+            if predicted is not None and actual is not None:
+                self.gap_sums[gap] += sign * (actual - predicted)
+                self.gap_counts[gap] += sign
+                if not self.gap_counts[gap]:
+                    self.gap_sums[gap] = 0.0 # Drop rounding residue once nothing is left
+
+    def mean_gap(self, gap):
+        """Mean of actual minus predicted rating ("pleasure" or "mastery"), or None without rated activities."""
+        count = self.gap_counts[gap]
+        return self.gap_sums[gap] / count if count else None
+
+    def _state(self):
+        exact, sums = super()._state()
+        return exact + (self.gap_counts,), sums + tuple(self.gap_sums[gap] for gap in self.GAPS)
+
+
+class ThoughtRecordStats(CollectionStats):
+    """Adds the mean initial-to-final intensity drop of each emotion in thought records."""
+    def __init__(self, date_field, records=()):
+        self.drop_sums = {} # emotion -> sum of (initial - final) intensity
+        self.drop_counts = Counter() # emotion -> records that rated it both before and after
+        super().__init__(date_field, records)
+
+    def _apply(self, record, sign):
+        super()._apply(record, sign)
+        initial, final = record.get("Initial Emotions"), record.get("Final Emotions")
+        if not isinstance(initial, dict) or not isinstance(final, dict):
+            return
+        for emotion, before in initial.items():
+            before, after = _number(before), _number(final.get(emotion))
+            if before is None or after is None:
+                continue
+            _bump(self.drop_counts, emotion, sign)
+            if emotion in self.drop_counts:
+                self.drop_sums[emotion] = self.drop_sums.get(emotion, 0.0) + sign * (before - after)
+            else:
+                self.drop_sums.pop(emotion, None)
+
+    def mean_drops(self):
+        """Returns {emotion: mean intensity drop}, largest drop first."""
+        drops = {emotion: self.drop_sums[emotion] / count for emotion, count in self.drop_counts.items()}
+        return dict(sorted(drops.items(), key=lambda item: -item[1]))
+
+    def _state(self):
+        exact, sums = super()._state()
+        emotions = sorted(self.drop_counts)
+        return exact + (self.drop_counts,), sums + tuple(self.drop_sums[emotion] for emotion in emotions)
+
+
+class ProblemSolvingStats(CollectionStats):
+    """Adds counts of problems per status."""
+    # Status groups shown in summaries; other statuses (Abandoned, N/A) are only in status_counts
+    OPEN_STATUSES = ("Open",)
+    IN_PROGRESS_STATUSES = ("Partially Solved",)
+    RESOLVED_STATUSES = ("Solved",)
+
+    def __init__(self, date_field, records=()):
+        self.status_counts = Counter()
+        super().__init__(date_field, records)
+
+    def _apply(self, record, sign):
+        super()._apply(record, sign)
+        _bump(self.status_counts, record.get("Problem Status", "Open"), sign)
+
+    def _count(self, statuses):
+        return sum(self.status_counts.get(status, 0) for status in statuses)
+
+    @property
+    def open(self):
+        return self._count(self.OPEN_STATUSES)
+
+    @property
+    def in_progress(self):
+        return self._count(self.IN_PROGRESS_STATUSES)
+
+    @property
+    def resolved(self):
+        return self._count(self.RESOLVED_STATUSES)
+
+    def _state(self):
+        exact, sums = super()._state()
+        return exact + (self.status_counts,), sums
@@ -6,9 +6,11 @@
 from ttkthemes import ThemedTk
 import tkinter as tk
 from tkinter import ttk
+from concurrent.futures import ThreadPoolExecutor
 
 # Import DataManager
 from data_manager import DataManager
+from change_events import IdleEventBatcher
 
 # Import all your page classes (ensure these files exist)
 from home_page import HomePage
@@ -18,9 +20,19 @@ from thought_record_page import ThoughtRecordPage
 from problem_solving_page import ProblemSolvingPage
 from progress_page import ProgressPage
 from relaxation_page import RelaxationPage
+from search_page import SearchPage
 
 class CBTApp(ThemedTk):
-    def __init__(self, *args, **kwargs):
+    # Every page, by name. Pages are only constructed the first time they are shown (see get_page)
+    PAGE_CLASSES = {Page.__name__: Page for Page in (HomePage, LearnPage, BehavioralActivationPage, ThoughtRecordPage,
+                                                     ProblemSolvingPage, ProgressPage, RelaxationPage, SearchPage)}
+    # Pages that need the DataManager passed to their constructor
+    DATA_PAGES = ("BehavioralActivationPage", "ThoughtRecordPage", "ProblemSolvingPage", "ProgressPage", "SearchPage")
+    # Pages the Home page links to, built one per idle cycle after the window is shown
+    PREBUILD_PAGES = ("LearnPage", "ThoughtRecordPage", "BehavioralActivationPage")
+    BACKGROUND_POLL_MS = 50 # How often run_in_background checks for finished work
+
+    def __init__(self, *args, prebuild_pages=True, preload_data=True, **kwargs):
         super().__init__(*args, **kwargs)
 
         self.withdraw() # <--- ADDED: Hides the window during setup for a cleaner start
@@ -35,7 +47,19 @@ class CBTApp(ThemedTk):
         self.minsize(900, 600) # Set a minimum size for the window
 
         # Initialize the centralized DataManager
-        self.data_manager = DataManager()
+        # Saves are applied in memory immediately and written to disk in the background,
+        # so the UI never waits on a full-file write. Pending writes are flushed on close.
+        self.data_manager = DataManager(write_behind=True, snapshots=True)
+        if preload_data:
+            # Parses the data files on background threads while the widgets below are built;
+            # a page that reads a collection earlier only waits for the rest of its parse
+            self.data_manager.preload()
+        # Pages subscribe here to be told about data changes, batched once per idle cycle
+        self.change_events = IdleEventBatcher(self, self.data_manager)
+        # Worker threads for run_in_background (e.g. loading collections for the page summaries)
+        self._background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="app-background")
+        self._statistics_callbacks = [] # Waiting for the statistics load in progress (see request_statistics)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Configure the main window's grid layout
         self.grid_rowconfigure(0, weight=1) # The content area (container) will expand
@@ -64,29 +88,25 @@ class CBTApp(ThemedTk):
         ttk.Button(sidebar_frame, text="Relaxation", command=lambda: self.show_frame("RelaxationPage"), width=20).pack(pady=5)
         ttk.Button(sidebar_frame, text="Progress", command=lambda: self.show_frame("ProgressPage"), width=20).pack(pady=5)
 
+        # Global search: Enter opens the Search page with the typed words
+        ttk.Label(sidebar_frame, text="Search entries:").pack(pady=(20, 2), anchor="w")
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(sidebar_frame, textvariable=self.search_var, width=22)
+        search_entry.pack(pady=(0, 5))
+        search_entry.bind("<Return>", lambda event: self.show_frame("SearchPage", query=self.search_var.get()))
+
 
         # --- Main Content Area (Container for Pages) ---
         # <--- MODIFIED: Changed relief to "flat" for better integration with modern themes.
-        container = ttk.Frame(self, relief="flat")
-        container.grid(row=0, column=1, sticky="nsew")
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
-
-        self.frames = {} # Dictionary to hold all page instances
-
-        # List of page classes to instantiate
-        # Pass the DataManager instance to pages that need it
-        for Page in (HomePage, LearnPage, BehavioralActivationPage, ThoughtRecordPage, ProblemSolvingPage, ProgressPage, RelaxationPage):
-            page_name = Page.__name__
-            if page_name in ["BehavioralActivationPage", "ThoughtRecordPage", "ProblemSolvingPage", "ProgressPage"]:
-                frame = Page(container, self, self.data_manager) # Pass data_manager
-            else:
-                frame = Page(container, self) # Pages like HomePage, LearnPage, RelaxationPage don't need data_manager directly
-            
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew") # Stack all pages in the same grid cell
+        self.container = ttk.Frame(self, relief="flat")
+        self.container.grid(row=0, column=1, sticky="nsew")
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+
+        self.frames = {} # Page instances built so far (see get_page)
+        self.current_page = None # Name of the page on screen
 
-        self.show_frame("HomePage") # Show the home page initially
+        self.show_frame("HomePage") # Show the home page initially; it is the only page built before the window appears
 
         # --- Styling (Optional but Recommended) ---
         # <--- REMOVED: This block is now handled by ttkthemes and the global configure below.
@@ -109,13 +129,98 @@ class CBTApp(ThemedTk):
 
         self.deiconify() # <--- ADDED: Shows the main window after setup is complete
 
+        if prebuild_pages:
+            self.after_idle(self._prebuild_pages, list(self.PREBUILD_PAGES))
+
+
+    def _on_close(self):
+        """Writes any pending data to disk before the window is destroyed."""
+        self._background.shutdown(wait=False, cancel_futures=True)
+        self.data_manager.flush()
+        self.destroy()
+
+    def run_in_background(self, function, callback, *args, error_callback=None):
+        """
+        Runs function(*args) on a worker thread and then callback(result) on the Tk main loop.
+        The function must not touch Tk. If it raises, the error is printed and error_callback(error)
+        runs instead, so callers can always clean up.
+        """
+        future = self._background.submit(function, *args)
+        self.after(self.BACKGROUND_POLL_MS, self._poll_background, future, callback, error_callback)
+
+    def _poll_background(self, future, callback, error_callback):
+        if not future.done():
+            self.after(self.BACKGROUND_POLL_MS, self._poll_background, future, callback, error_callback)
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Error in background task: {e}")
+            if error_callback is not None:
+                error_callback(e)
+            return
+        callback(result)
+
+    # --- Running statistics for the page summaries ---
+    def request_statistics(self, callback):
+        """
+        Calls callback(statistics) on the Tk main loop, with statistics mapping each collection to
+        its running aggregates (see DataManager.get_statistics). The first time, the collections
+        are loaded on a worker thread; requests made while that runs share the load.
+        If loading fails, the callback is dropped and the next request tries again.
+        """
+        if callback in self._statistics_callbacks:
+            return
+        self._statistics_callbacks.append(callback)
+        if len(self._statistics_callbacks) == 1:
+            self.run_in_background(self._load_statistics, self._deliver_statistics,
+                                   error_callback=lambda error: self._statistics_callbacks.clear())
+
+    def _load_statistics(self):
+        """Runs on a worker thread: makes sure every collection and its statistics are loaded."""
+        for collection in self.data_manager.COLLECTIONS:
+            self.data_manager.get_statistics(collection)
+
+    def _deliver_statistics(self, result=None):
+        # Read again here, so the figures include changes made while the load was running
+        statistics = {collection: self.data_manager.get_statistics(collection) for collection in self.data_manager.COLLECTIONS}
+        callbacks, self._statistics_callbacks = self._statistics_callbacks, []
+        for callback in callbacks:
+            callback(statistics)
+
+    # --- Page registry ---
+    def get_page(self, page_name):
+        """Returns the page called `page_name`, constructing it the first time it is needed."""
+        frame = self.frames.get(page_name)
+        if frame is None:
+            Page = self.PAGE_CLASSES[page_name]
+            if page_name in self.DATA_PAGES:
+                frame = Page(self.container, self, self.data_manager) # Pass data_manager
+            else:
+                frame = Page(self.container, self) # Pages like HomePage, LearnPage, RelaxationPage don't need data_manager directly
+            self.frames[page_name] = frame
+            frame.grid(row=0, column=0, sticky="nsew") # Stack all pages in the same grid cell
+            frame.lower() # Built pages stay hidden until show_frame raises them
+        return frame
+
+    def _prebuild_pages(self, page_names):
+        """Builds the next page of `page_names` while the app is idle, then schedules the rest."""
+        while page_names and page_names[0] in self.frames:
+            page_names.pop(0)
+        if not page_names:
+            return
+        self.get_page(page_names.pop(0))
+        if page_names:
+            # One page per idle cycle, so pending clicks and redraws are handled in between
+            self.after_idle(self._prebuild_pages, page_names)
 
     def show_frame(self, page_name, **kwargs):
         """
         Raises the specified page frame to the top, making it visible.
         Accepts kwargs to pass data to the page (e.g., for editing a record).
+        The page is constructed on first use.
         """
-        frame = self.frames[page_name]
+        frame = self.get_page(page_name)
 
         # If kwargs are provided, it usually means we're loading specific data (e.g., for editing).
         # In this case, we call the page's 'load_data' method if it exists.
@@ -130,6 +235,7 @@ class CBTApp(ThemedTk):
             frame.refresh_data_display()
             
         frame.tkraise()
+        self.current_page = page_name
 
         # Handle specific page cleanup/state when navigating away from it
         if page_name != "RelaxationPage" and "RelaxationPage" in self.frames:
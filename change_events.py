@@ -0,0 +1,74 @@
+# change_events.py
+
+import threading
+from collections import namedtuple
+
+# Kinds of change DataManager publishes
+ADDED = "added" # New records; `timestamps` lists their creation_timestamps
+UPDATED = "updated" # Records replaced in place
+DELETED = "deleted" # Records removed
+BULK_CHANGED = "bulk-changed" # The whole collection was replaced (no timestamps)
+EXTERNALLY_RELOADED = "externally-reloaded" # The collection changed on disk and was re-read (no timestamps)
+EVENT_KINDS = (ADDED, UPDATED, DELETED, BULK_CHANGED, EXTERNALLY_RELOADED)
+
+# One change to a collection. `version` is the collection's version right after the change
+# (see DataManager.get_collection_version), so a listener can tell whether it missed any.
+ChangeEvent = namedtuple("ChangeEvent", ["kind", "collection", "timestamps", "version"])
+
+
+class IdleEventBatcher:
+    """
+    Relays DataManager change events to Tk code, batched per idle cycle.
+
+    DataManager calls its subscribers synchronously from whichever thread made the change. This
+    class only queues the events there, and hands everything queued to its own subscribers in one
+    call, from the Tk main loop, once it is idle. So a burst of changes (e.g. a multi-row delete)
+    causes a single UI update. Events from other threads (e.g. a reload done by a loader thread)
+    can't schedule Tk callbacks themselves and are picked up by a slow poll instead.
+    """
+    POLL_MS = 200
+
+    def __init__(self, widget, data_manager):
+        self.widget = widget
+        self._subscribers = []
+        self._pending = []
+        self._lock = threading.Lock()
+        self._scheduled = False # A delivery is queued with after_idle
+        data_manager.subscribe(self._on_event)
+        self.widget.after(self.POLL_MS, self._poll)
+
+    def subscribe(self, callback):
+        """Calls callback(events) on the Tk main loop with each batch of ChangeEvents, in order."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _on_event(self, event):
+        """DataManager subscriber; may run on any thread and only queues the event."""
+        with self._lock:
+            self._pending.append(event)
+            if self._scheduled or threading.current_thread() is not threading.main_thread():
+                return
+            self._scheduled = True
+        self.widget.after_idle(self._deliver)
+
+    def _poll(self):
+        with self._lock:
+            ready = self._pending and not self._scheduled
+        if ready:
+            self._deliver()
+        self.widget.after(self.POLL_MS, self._poll)
+
+    def _deliver(self):
+        with self._lock:
+            events, self._pending = self._pending, []
+            self._scheduled = False
+        if not events:
+            return
+        for callback in list(self._subscribers):
+            try:
+                callback(events)
+            except Exception as e:
+                print(f"Error handling data change events in {callback}: {e}")
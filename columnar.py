@@ -0,0 +1,124 @@
+# columnar.py
+
+import datetime
+import math
+from array import array
+from bisect import bisect_left
+
+class NumericColumns:
+    """
+    Array-backed columns of a collection's numeric fields, kept sorted by date.
+
+    Every row holds the record's date as a proleptic Gregorian ordinal (column "date") plus one
+    float column per numeric field (missing or non-numeric values are NaN). Records without a
+    usable date are left out, since they can't be placed on a time axis.
+    Rows are inserted and removed one at a time as records change, so the columns never have to be
+    rebuilt from the records. as_numpy() returns zero-copy NumPy views of the arrays.
+    """
+    DATE_COLUMN = "date"
+
+    def __init__(self, date_field, fields, records=()):
+        """`fields` maps column name -> record field, e.g. {"actual_pleasure": "Actual Pleasure"}."""
+        self.date_field = date_field
+        self.fields = dict(fields)
+        self.version = 0 # Bumped on every change, so views/plots can tell when they are stale
+        self._rows = [] # Sorted (date ordinal, record key) of each row, parallel to the arrays
+        self._columns = {self.DATE_COLUMN: array("q")}
+        for name in self.fields:
+            self._columns[name] = array("d")
+        for row, record in sorted(self._row_entries(records), key=lambda entry: entry[0]):
+            self._rows.append(row)
+            for name, value in zip(self._columns, self._row_values(row[0], record)):
+                self._columns[name].append(value)
+
+    def _row_entries(self, records):
+        """Yields ((date ordinal, key), record) for each dated record of a (key, record) iterable."""
+        for key, record in records:
+            ordinal = self._ordinal(record)
+            if ordinal is not None:
+                yield (ordinal, key), record
+
+    def _ordinal(self, record):
+        """Returns the ordinal of a record's date, or None if it has no valid 'YYYY-MM-DD' date."""
+        value = record.get(self.date_field)
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.toordinal()
+        try:
+            return datetime.date.fromisoformat(str(value)[:10]).toordinal()
+        except ValueError:
+            return None
+
+    def _row_values(self, ordinal, record):
+        """Returns a row's values, in column order."""
+        values = [ordinal]
+        for field in self.fields.values():
+            value = record.get(field)
+            try:
+                values.append(float(value) if value is not None else math.nan)
+            except (TypeError, ValueError):
+                values.append(math.nan)
+        return values
+
+    def _mutate(self, name, method, *args):
+        """
+        Inserts into or deletes from one column. If NumPy views of the column are still alive,
+        the array can't be resized, so it is replaced by a copy (the old views keep their snapshot).
+        """
+        column = self._columns[name]
+        try:
+            getattr(column, method)(*args)
+        except BufferError:
+            column = self._columns[name] = array(column.typecode, column)
+            getattr(column, method)(*args)
+
+    def insert(self, key, record):
+        """Adds the row of a record (a no-op for records without a date)."""
+        ordinal = self._ordinal(record)
+        if ordinal is None:
+            return
+        position = bisect_left(self._rows, (ordinal, key))
+        self._rows.insert(position, (ordinal, key))
+        self.version += 1
+        for name, value in zip(list(self._columns), self._row_values(ordinal, record)):
+            self._mutate(name, "insert", position, value)
+
+    def remove(self, key, record):
+        """Removes the row of a record (as it was when inserted)."""
+        ordinal = self._ordinal(record)
+        position = bisect_left(self._rows, (ordinal, key)) if ordinal is not None else len(self._rows)
+        if position == len(self._rows) or self._rows[position] != (ordinal, key):
+            # The record's date was edited in place since it was inserted: fall back to a scan
+            position = next((i for i, row in enumerate(self._rows) if row[1] == key), None)
+            if position is None:
+                return
+        del self._rows[position]
+        self.version += 1
+        for name in list(self._columns):
+            self._mutate(name, "pop", position)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def column(self, name):
+        """Returns the underlying array of a column (shared, do not modify)."""
+        return self._columns[name]
+
+    def as_numpy(self, *names):
+        """
+        Returns zero-copy NumPy views of the given columns (all of them by default) as a dict.
+        The "date" column is int64 ordinals; use dates_as_numpy() for datetime64 values.
+        Views are snapshots: later changes to the collection go to new arrays.
+        """
+        import numpy as np # Only needed by plotting/statistics callers
+        names = names or tuple(self._columns)
+        views = {}
+        for name in names:
+            column = self._columns[name]
+            dtype = np.int64 if column.typecode == "q" else np.float64
+            views[name] = np.frombuffer(column, dtype=dtype) if len(column) else np.empty(0, dtype=dtype)
+        return views
+
+    def dates_as_numpy(self):
+        """Returns the "date" column as datetime64[D] values (one vectorized conversion)."""
+        epoch_ordinal = datetime.date(1970, 1, 1).toordinal()
+        return (self.as_numpy(self.DATE_COLUMN)[self.DATE_COLUMN] - epoch_ordinal).astype("datetime64[D]")
@@ -3,6 +3,49 @@
 import json
 import os
 import datetime
+import gc
+import itertools
+import threading
+import time
+import atexit
+import hashlib
+import pickle
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from aggregates import ActivityStats, ThoughtRecordStats, ProblemSolvingStats
+from change_events import ChangeEvent, ADDED, UPDATED, DELETED, BULK_CHANGED, EXTERNALLY_RELOADED
+from columnar import NumericColumns
+from records import ThoughtRecord, BehavioralActivationActivity, ProblemSolvingRecord, json_default
+from search_index import SearchIndex
+
+def read_json_list(filepath, warning=None):
+    """
+    Parses a JSON array file (a collection, or one to import) without ever changing it. Returns
+    None if it is missing, empty, unreadable or not a list. A read or parse error is printed
+    followed by `warning` if one is given, e.g. "Skipping it."; otherwise reporting is left to
+    the caller. Module-level, so preload() can run it in a worker process.
+    """
+    try:
+        if os.path.getsize(filepath) == 0:
+            return None
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        if warning is not None:
+            print(f"Warning: could not read {filepath}: {e}. {warning}")
+        return None
+    return data if isinstance(data, list) else None
+
+def _file_sha1(filepath):
+    """Returns the SHA-1 hex digest of a file's contents."""
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 class DataManager:
     """
@@ -10,16 +53,131 @@ class DataManager:
     (thought records, behavioral activation, problem solving).
     Ensures data consistency and handles file operations.
     Each record will have a 'creation_timestamp' for unique identification, especially for editing/deleting.
+
+    Three storage modes are supported:
+    - "json" (default): each collection is a single JSON array that is rewritten on every change.
+    - "journal": each collection is an append-only JSONL log of add/update/delete operations.
+      Reads replay the log, and the log is compacted on a background thread once the number
+      of dead (superseded or deleted) entries passes `compaction_threshold`.
+    - "sharded": each collection is a directory of per-month JSON files ("2024-05.json", plus
+      "undated.json") described by a small manifest.json. A change only rewrites the shards of the
+      records it touches, and date-bounded queries only open the months they cover.
+
+    Files are always written to a temporary file, fsynced and atomically renamed over the
+    original, so a crash mid-write never leaves a truncated collection behind.
+    With `write_behind=True` (JSON mode), changes are applied to the in-memory cache right away
+    and a burst of them is coalesced into one write on a background thread after `flush_delay`
+    seconds. Call flush() before exiting to write anything still pending.
+
+    Records are returned as the typed, dict-like classes from records.py (ThoughtRecord,
+    BehavioralActivationActivity, ProblemSolvingRecord) and are stored on disk as plain JSON objects.
+
+    Every change is published as a ChangeEvent (see change_events.py) to the callbacks registered
+    with subscribe(), so views can update themselves instead of polling.
+
+    search() answers full-text queries from an inverted index of the free-text fields
+    (see search_index.py), kept in "search_index.json" next to the data files.
+
+    With `snapshots=True` (JSON mode), flush() also saves each loaded collection as a pickled list
+    of typed records ("thought_records.snapshot" next to "thought_records.json"). A cold start
+    loads the snapshot instead of parsing the JSON and building the records again, as long as it
+    was taken from the same JSON file (same size and modification time, or same content hash).
+    The JSON stays the source of truth: a missing, stale or unreadable snapshot is ignored.
     """
-    def __init__(self, base_dir="data"): # Use base_dir argument for flexibility
+    SNAPSHOT_FORMAT = 2 # Bump when the snapshot layout or the pickled record classes change
+    STORAGE_MODES = ("json", "journal", "sharded")
+    COLLECTIONS = ("thought_records", "behavioral_activation_activities", "problem_solving_records")
+
+    def __init__(self, base_dir="data", storage="json", compaction_threshold=500, write_behind=False, flush_delay=0.5, snapshots=False): # Use base_dir argument for flexibility
+        if storage not in self.STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode '{storage}'. Expected one of {self.STORAGE_MODES}.")
         self.base_dir = base_dir
+        self.storage = storage
+        self.compaction_threshold = compaction_threshold
         os.makedirs(self.base_dir, exist_ok=True)
 
+        # Guards the record cache and journal bookkeeping, which background compaction also touches
+        self._lock = threading.RLock()
+
+        # In-memory record cache: storage path -> {"signature": (mtime_ns, size, inode), "index": dict}
+        # Each collection is cached as its primary-key index (creation_timestamp -> record, in insertion
+        # order) and reused until its file's signature changes on disk.
+        # Derived structures (e.g. the sorted date index under "dates") are built lazily and kept
+        # in step by _put_record/_pop_record.
+        self._cache = {}
+        self._unkeyed_ids = itertools.count() # Private keys for records without a usable timestamp
+        # Collection file path -> change counter, bumped on every write and every reload from disk
+        # (see get_collection_version). Never reset, so a version is never reused for other contents.
+        self._versions = {}
+        self._subscribers = [] # Change event callbacks (see subscribe)
+        self._last_timestamp = None # Last creation_timestamp handed out, to keep them unique
+
+        # Write-behind bookkeeping: JSON paths whose cached changes are not on disk yet
+        self.write_behind = write_behind
+        self.flush_delay = flush_delay
+        self._dirty = set()
+        self._flush_condition = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock() # Serializes flushes from the worker and from flush()
+        self._flush_thread = None
+
+        # Binary snapshots of the JSON collections (see _load_snapshot): JSON path -> signature of
+        # the JSON file the snapshot on disk was taken from
+        self.snapshots = snapshots and storage == "json"
+        self._snapshot_sources = {}
+
+        if self.write_behind or self.snapshots:
+            atexit.register(self.flush) # Safety net; CBTApp also flushes explicitly on close
+
+        # Collections being loaded, by preload() or by a reader (see _record_index):
+        # storage path -> Future of (signature, index, journal line count) or None
+        self._preloads = {}
+
+        # Full-text index, loaded or built on the first search (see _search_index)
+        self.search_index_file = os.path.join(self.base_dir, "search_index.json")
+        self._search = None
+        self._search_dirty = False # Changed since it was last saved
+
+        # Parsed shard files (only used in "sharded" mode): shard path -> (signature, records)
+        self._shard_cache = {}
+
+        # Journal bookkeeping (only used in "journal" mode)
+        self._journal_state = {} # journal path -> {"lines": number of operations in the file}
+        self._compacting = {} # journal path -> list of op lines appended while a compaction is running
+
         # Define the file paths for each type of record as instance variables
         self.thought_records_file = os.path.join(self.base_dir, "thought_records.json")
         self.behavioral_activation_file = os.path.join(self.base_dir, "behavioral_activation_activities.json")
         self.problem_solving_records_file = os.path.join(self.base_dir, "problem_solving_records.json")
 
+        # Collection names (as used by query()) mapped to their file paths
+        self._collection_files = {
+            "thought_records": self.thought_records_file,
+            "behavioral_activation_activities": self.behavioral_activation_file,
+            "problem_solving_records": self.problem_solving_records_file,
+        }
+        self._collection_names = {filepath: collection for collection, filepath in self._collection_files.items()}
+
+        # The user-facing date field of each record type
+        self._date_fields = {
+            self.thought_records_file: "Date",
+            self.behavioral_activation_file: "Activity Date",
+            self.problem_solving_records_file: "Date",
+        }
+
+        # Typed record class of each collection; records are returned as these objects (see records.py)
+        self._record_types = {
+            self.thought_records_file: ThoughtRecord,
+            self.behavioral_activation_file: BehavioralActivationActivity,
+            self.problem_solving_records_file: ProblemSolvingRecord,
+        }
+
+        # Running aggregates class of each collection (see aggregates.py and get_statistics)
+        self._stats_types = {
+            self.thought_records_file: ThoughtRecordStats,
+            self.behavioral_activation_file: ActivityStats,
+            self.problem_solving_records_file: ProblemSolvingStats,
+        }
+
         # Initialize empty JSON files if they don't exist or are empty
         self._initialize_file(self.thought_records_file)
         self._initialize_file(self.behavioral_activation_file)
@@ -27,90 +185,1303 @@ class DataManager:
 
     def _initialize_file(self, file_path):
         """Ensures a JSON file exists and is initialized as an empty list if not."""
+        if self.storage == "journal":
+            self._initialize_journal(file_path)
+            return
+        if self.storage == "sharded":
+            self._initialize_shards(file_path)
+            return
         if not os.path.exists(file_path) or os.stat(file_path).st_size == 0:
             with open(file_path, 'w') as f:
                 json.dump([], f) # Initialize as an empty list for records
 
+    def _storage_path(self, filepath):
+        """Returns the file that actually holds a collection in the current storage mode."""
+        if self.storage == "journal":
+            return self._journal_path(filepath)
+        if self.storage == "sharded":
+            return self._shard_dir(filepath)
+        return filepath
+
+    def _file_signature(self, path):
+        """
+        Returns (mtime_ns, size, inode) for a file, or None if it does not exist.
+        For a shard directory, returns the signatures of all the JSON files in it.
+        """
+        try:
+            if os.path.isdir(path):
+                with os.scandir(path) as entries:
+                    return tuple(sorted(
+                        (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size, entry.stat().st_ino)
+                        for entry in entries if entry.name.endswith(".json")
+                    ))
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _cache_is_valid(self, path):
+        """Checks whether the cached copy of a file still matches what is on disk."""
+        entry = self._cache.get(path)
+        return entry is not None and entry["signature"] == self._file_signature(path)
+
+    def _set_cache(self, path, index, signature=None):
+        """Stores a collection's record index in the cache, stamped with the file's current signature by default."""
+        if signature is None:
+            signature = self._file_signature(path)
+        self._cache[path] = {"signature": signature, "index": index}
+
+    def _stamp_cache(self, path):
+        """Records that the cached collection matches the file as it is now on disk (after our own write)."""
+        if path in self._cache:
+            self._cache[path]["signature"] = self._file_signature(path)
+
+    def _index_key(self, index, record):
+        """
+        Returns the primary key a record is stored under in a collection index.
+        Records without a 'creation_timestamp' (older data) or with a duplicate one
+        get a private key, so they are kept but can't be addressed by timestamp.
+        """
+        key = record.get("creation_timestamp")
+        if not isinstance(key, str) or key in index:
+            key = f"~unkeyed-{next(self._unkeyed_ids)}" # Sorts after real timestamps on the same date
+        return key
+
+    def _make_record(self, filepath, data):
+        """
+        Converts a record dict (or another record) into the typed record class of its collection.
+        The record is frozen: it is shared with the cache, so callers that want to edit it take a copy().
+        """
+        return self._record_types[filepath].from_dict(data).freeze()
+
+    def _build_index(self, filepath, records):
+        """Builds the primary-key index (creation_timestamp -> record, in insertion order) for a list of records."""
+        index = {}
+        for record in records:
+            record = self._make_record(filepath, record)
+            index[self._index_key(index, record)] = record
+        return index
+
+    def _record_index(self, filepath):
+        """
+        Returns the cached primary-key index of a collection: an insertion-ordered dict
+        mapping 'creation_timestamp' to record, so single-record operations are O(1).
+        The file is only re-read if it was changed on disk (e.g. by another process) since it was cached.
+        The returned dict is shared with the cache and must not be modified by callers.
+
+        The file is read without holding the lock (see _load_collection), so other threads are not
+        held up by a long load, and the result is installed under it. A load already running for
+        the collection (a preload, or another reader) is waited for instead of reading the file
+        again. Its loader never takes the lock, so waiting while holding it is safe.
+        """
+        path = self._storage_path(filepath)
+        while True:
+            with self._lock:
+                if path in self._dirty or self._cache_is_valid(path): # Unflushed changes make the cache authoritative
+                    return self._cache[path]["index"]
+                future = self._preloads.get(path)
+                loading = future is None
+                if loading:
+                    future = self._preloads[path] = Future()
+            if loading:
+                try:
+                    future.set_result(self._load_collection(filepath))
+                except BaseException as e:
+                    future.set_exception(e)
+            try:
+                loaded = future.result()
+            except Exception as e:
+                with self._lock:
+                    if self._preloads.get(path) is future:
+                        del self._preloads[path]
+                if loading:
+                    raise
+                print(f"Error preloading {filepath}: {e}. Loading it again.")
+                continue
+            with self._lock:
+                if self._preloads.get(path) is future:
+                    del self._preloads[path]
+                if path in self._dirty or self._cache_is_valid(path):
+                    return self._cache[path]["index"]
+                if loaded is not None and loaded[0] == self._file_signature(path):
+                    self._install_index(filepath, loaded[1], loaded[0], loaded[2])
+                    return loaded[1]
+            # The file changed while it was read, or the preload gave up on it: read it again
+
+    def _read_signed(self, filepath, read):
+        """
+        Returns (signature, read(signature)), where signature is the collection file's signature
+        taken before reading. So a change made during the read is never missed: the signature is
+        already stale then, and the result is not installed.
+        """
+        signature = self._file_signature(self._storage_path(filepath))
+        return signature, read(signature)
+
+    def _load_collection(self, filepath):
+        """
+        Reads a collection from storage without taking the lock. Returns (signature, index, journal
+        line count, or None outside journal mode), for _install_index.
+        """
+        signature, (index, journal_lines) = self._read_signed(filepath, lambda signature: self._read_storage(filepath, signature))
+        return signature, index, journal_lines
+
+    def _read_storage(self, filepath, signature):
+        """Returns (index, journal line count or None) read from the collection's storage files."""
+        if self.storage == "journal":
+            return self._replay_journal(filepath)
+        if self.storage == "sharded":
+            return self._load_shards(filepath), None
+        index = self._load_snapshot(filepath, signature)
+        if index is None:
+            index = self._build_index(filepath, self._read_json_file(filepath))
+        return index, None
+
+    def _install_index(self, filepath, index, signature, journal_lines=None):
+        """Caches a freshly loaded collection index read from a file with the given signature. Needs the lock."""
+        path = self._storage_path(filepath)
+        reloaded = path in self._cache # A stale copy is being replaced, as opposed to a first load
+        self._set_cache(path, index, signature)
+        if self.storage == "journal":
+            self._journal_state[path] = {"lines": journal_lines or 0}
+        if self.storage == "sharded":
+            self._track_shards(filepath)
+        # The search index is only attached on the first search; until then changes are noted (see _attach_search)
+        self._cache[path]["search_base"] = signature
+        if reloaded:
+            self._notify(EXTERNALLY_RELOADED, filepath)
+        else:
+            self._bump_version(filepath)
+
+    # --- Background preload ---
+    def preload(self, collections=None, processes=False):
+        """
+        Starts loading collections (all by default) in the background, so the first read of each
+        only waits for whatever is left of its load instead of doing all of it on the caller's thread.
+        Opt-in: call it right after creating the DataManager, e.g. while the UI is being built.
+
+        The collections are loaded concurrently, one worker per collection, without holding the
+        DataManager's lock (see _load_collection). With processes=True, JSON files are parsed in
+        worker processes, so the parsing also runs in parallel with this process's Python code;
+        the records are then built on a thread here.
+        """
+        filepaths = [self._collection_path(collection) for collection in (collections or self.COLLECTIONS)]
+        threads = ThreadPoolExecutor(max_workers=len(filepaths) or 1, thread_name_prefix="data-preload")
+        parser = ProcessPoolExecutor(max_workers=len(filepaths) or 1) if processes and self.storage == "json" else None
+        with self._lock:
+            for filepath in filepaths:
+                path = self._storage_path(filepath)
+                if path in self._cache or path in self._preloads:
+                    continue
+                # A collection with a snapshot is most likely loaded from it, without parsing the JSON
+                if parser is not None and not (self.snapshots and os.path.exists(self._snapshot_path(filepath))):
+                    signature, parsed = self._read_signed(filepath, lambda signature: parser.submit(read_json_list, filepath))
+                    future = threads.submit(self._build_parsed, filepath, signature, parsed)
+                else:
+                    future = threads.submit(self._load_collection, filepath)
+                self._preloads[path] = future
+                future.add_done_callback(lambda future, filepath=filepath: self._finish_preload(filepath, future))
+        threads.shutdown(wait=False)
+        if parser is not None:
+            parser.shutdown(wait=False)
+
+    def _build_parsed(self, filepath, signature, parsed):
+        """
+        Runs on a preload thread: builds the records of a JSON file parsed in a worker process
+        (`parsed` is its Future). Returns (signature, index, None), or None to fall back to a regular load.
+        """
+        records = parsed.result()
+        if records is None:
+            return None
+        return signature, self._build_index(filepath, records), None
+
+    def _finish_preload(self, filepath, future):
+        """Caches a preloaded collection as soon as it is ready, unless a reader already took it over."""
+        path = self._storage_path(filepath)
+        with self._lock:
+            if self._preloads.get(path) is not future:
+                return
+            del self._preloads[path]
+            if future.cancelled() or future.exception() is not None:
+                return
+            preloaded = future.result()
+            if preloaded is None or path in self._dirty or self._cache_is_valid(path):
+                return
+            if preloaded[0] == self._file_signature(path): # Otherwise the file changed meanwhile; the next read loads it
+                self._install_index(filepath, preloaded[1], preloaded[0], preloaded[2])
+
+    def _bump_version(self, filepath):
+        """Marks a collection as changed (see get_collection_version) and returns its new version."""
+        with self._lock:
+            version = self._versions[filepath] = self._versions.get(filepath, 0) + 1
+            return version
+
+    # --- Change events ---
+    def subscribe(self, callback):
+        """
+        Registers callback(event) to be called with a ChangeEvent after every change to a collection.
+        It is called synchronously, with the DataManager's lock held, on whichever thread made the
+        change, so it must be quick and must not block on other threads (see IdleEventBatcher).
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _notify(self, kind, filepath, timestamps=()):
+        """Bumps a collection's version and publishes the change to the subscribers."""
+        with self._lock:
+            event = ChangeEvent(kind, self._collection_names[filepath], tuple(timestamps), self._bump_version(filepath))
+            for callback in list(self._subscribers):
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"Error in data change subscriber {callback}: {e}")
+
+    def get_collection_version(self, collection):
+        """
+        Returns a counter that increases every time a collection changes, whether through this
+        DataManager or on disk (e.g. another process). Views can remember the version they last
+        rendered and skip reloading while it is unchanged.
+        Returns None if the collection isn't cached or its file changed since it was read: its next
+        read will reload it, so it must be treated as changed. The file itself is never read here.
+        Doesn't take the lock (plain dict reads), so it never waits for a load running on another thread.
+        """
+        filepath = self._collection_path(collection)
+        path = self._storage_path(filepath)
+        entry = self._cache.get(path)
+        if entry is None or (path not in self._dirty and entry["signature"] != self._file_signature(path)):
+            return None
+        return self._versions.get(filepath, 0)
+
     def _load_data(self, filepath):
         """
         Internal helper method to load data from a given JSON file.
         Returns an empty list if the file does not exist or is empty/corrupt.
+        Served from the in-memory cache unless the file has changed on disk.
         """
+        return list(self._record_index(filepath).values())
+
+    def _read_json_file(self, filepath):
+        """Parses a collection's JSON file. Returns an empty list if it is missing or empty/corrupt."""
         if not os.path.exists(filepath):
             return []
-        with open(filepath, 'r') as f:
-            try:
+        try:
+            with open(filepath, 'r') as f:
                 # Attempt to load JSON data
                 data = json.load(f)
-                # If file is empty, json.load() might return None, ensure it's a list
-                return data if isinstance(data, list) else []
-            except json.JSONDecodeError:
-                # If JSON is malformed, return an empty list and print a warning
-                print(f"Warning: {filepath} is empty or contains malformed JSON. Returning empty list and re-initializing.")
-                self._save_data(filepath, []) # Attempt to fix by writing an empty list back
-                return []
-            except Exception as e:
-                # Catch any other potential errors during file reading
-                print(f"Error loading {filepath}: {e}. Returning empty list.")
+            # If file is empty, json.load() might return None, ensure it's a list
+            return data if isinstance(data, list) else []
+        except json.JSONDecodeError:
+            print(f"Warning: {filepath} is empty or contains malformed JSON. Returning empty list and re-initializing.")
+        except Exception as e:
+            # Catch any other potential errors during file reading
+            print(f"Error loading {filepath}: {e}. Returning empty list.")
+            return []
+        # Keep a copy of a malformed file for recovery instead of overwriting the user's data
+        if os.path.getsize(filepath) > 0:
+            backup_path = f"{filepath}.corrupt-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
+            try:
+                os.replace(filepath, backup_path)
+                print(f"The malformed file was moved to {backup_path}.")
+            except OSError as e:
+                print(f"Error backing up {filepath}: {e}. Leaving it untouched.")
                 return []
+        self._write_json_file(filepath, []) # Re-initialize with an empty list; the new signature makes the caller re-read it
+        return []
+
+    def _temp_path(self, path):
+        """Returns a temporary file name next to `path` that is unique to the writing thread."""
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def _replace_file(self, temp_path, path):
+        """Atomically moves a fully written temporary file over `path`."""
+        os.replace(temp_path, path)
+        if hasattr(os, "O_DIRECTORY"): # Persist the rename itself (POSIX only)
+            directory_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(directory_fd)
+            finally:
+                os.close(directory_fd)
+
+    def _write_temp_json(self, filepath, records):
+        """Writes records to a fsynced temporary file next to `filepath` and returns its path."""
+        temp_path = self._temp_path(filepath)
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(records, f, indent=4, default=json_default)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return temp_path
+
+    def _write_json_file(self, filepath, records):
+        """Atomically writes a list of records to a collection's JSON file. Returns True if successful."""
+        try:
+            self._replace_file(self._write_temp_json(filepath, records), filepath)
+            return True
+        except Exception as e:
+            print(f"Error saving data to {filepath}: {e}")
+            return False
 
     def _save_data(self, filepath, data):
         """
         Internal helper method to save data to a given JSON file.
+        In journal mode the collection is replaced by a freshly compacted journal.
+        The change is only published once it was written (or queued, in write-behind mode).
         """
-        try:
-            with open(filepath, 'w') as f:
-                json.dump(data, f, indent=4)
-        except Exception as e:
-            print(f"Error saving data to {filepath}: {e}")
+        with self._lock:
+            if self.storage == "journal":
+                saved = self._rewrite_journal(filepath, data)
+            elif self.storage == "sharded":
+                saved = self._rewrite_shards(filepath, data)
+            else:
+                self._set_cache(filepath, self._build_index(filepath, data), self._file_signature(filepath))
+                saved = self._commit_index(filepath, self._cache[filepath]["index"])
+            if saved:
+                self._notify(BULK_CHANGED, filepath)
+
+    def _persist_changes(self, filepath, ops):
+        """
+        Writes changes that were just applied to the cached index to storage:
+        one journal append in journal mode, a rewrite of the touched month shards in sharded mode,
+        and one (possibly deferred) file write in JSON mode.
+        Every call holds operations of one kind, published as a single change event once they are
+        persisted. If the write fails the cache was dropped and nothing is published.
+        """
+        if self.storage == "journal":
+            saved = self._append_journal_ops(filepath, ops)
+        elif self.storage == "sharded":
+            saved = self._write_dirty_shards(filepath)
+        else:
+            saved = self._commit_index(filepath, self._cache[filepath]["index"])
+        if saved:
+            kind = {"add": ADDED, "update": UPDATED, "delete": DELETED}[ops[0]["op"]]
+            self._notify(kind, filepath, [op["record"]["creation_timestamp"] if op["op"] == "add" else op["creation_timestamp"] for op in ops])
+
+    def _commit_index(self, filepath, index):
+        """
+        Persists a cached index that was just modified in place (JSON mode).
+        In write-behind mode the collection is only marked dirty and written later by the flush thread.
+        If a synchronous write fails the cache is dropped, so the next read reflects what is on disk.
+        Returns False in that case.
+        """
+        if self.write_behind:
+            self._dirty.add(filepath)
+            self._ensure_flush_thread()
+            self._flush_condition.notify()
+            return True
+        if self._write_json_file(filepath, list(index.values())):
+            self._stamp_cache(filepath)
+            return True
+        self._cache.pop(filepath, None)
+        return False
+
+    # --- Write-behind flushing ---
+    def _ensure_flush_thread(self):
+        """Starts the background flush thread on first use."""
+        if self._flush_thread is None:
+            self._flush_thread = threading.Thread(target=self._flush_worker, daemon=True)
+            self._flush_thread.start()
+
+    def _flush_worker(self):
+        """Background loop: waits for dirty collections, lets a burst settle, then writes them once."""
+        while True:
+            with self._lock:
+                while not self._dirty:
+                    self._flush_condition.wait()
+            time.sleep(self.flush_delay) # Coalesce further changes into the same write
+            self._flush_collections()
+
+    def flush(self):
+        """
+        Writes every collection with pending write-behind changes to disk, then the snapshots
+        and the search index. Safe to call at any time; the app calls it on shutdown.
+        """
+        self._flush_collections()
+        self._save_snapshots()
+        self._save_search_index()
+
+    def _flush_collections(self):
+        """Writes the collections with pending write-behind changes."""
+        with self._flush_lock:
+            with self._lock:
+                pending = {path: list(self._cache[path]["index"].values()) for path in self._dirty if path in self._cache}
+                self._dirty.clear()
+            for path, records in pending.items():
+                try:
+                    temp_path = self._write_temp_json(path, records) # Serialized outside the lock
+                    with self._lock:
+                        self._replace_file(temp_path, path)
+                        self._stamp_cache(path)
+                except Exception as e:
+                    print(f"Error saving data to {path}: {e}")
+                    with self._lock:
+                        self._dirty.add(path) # Retry on the next flush
+
+    def _new_timestamp(self):
+        """Returns a new ISO timestamp, strictly later than any handed out before (even within a batch)."""
+        now = datetime.datetime.now()
+        with self._lock:
+            if self._last_timestamp is not None and now <= self._last_timestamp:
+                now = self._last_timestamp + datetime.timedelta(microseconds=1)
+            self._last_timestamp = now
+        return now.isoformat()
 
     def _add_creation_timestamp(self, record_data):
         """Helper to add 'creation_timestamp' to a record if it's not already present."""
         if "creation_timestamp" not in record_data:
-            record_data["creation_timestamp"] = datetime.datetime.now().isoformat()
+            record_data["creation_timestamp"] = self._new_timestamp()
         return record_data
 
+    def _get_record_by_timestamp(self, filepath, record_timestamp):
+        """
+        Generic method to fetch a single record by its 'creation_timestamp'.
+        Returns None if no record matches.
+        """
+        record = self._record_index(filepath).get(record_timestamp)
+        return record.copy() if record is not None else None
+
+    def _add_record(self, filepath, record_data):
+        """
+        Generic method to append a new record to a collection.
+        In journal mode this appends a single 'add' operation instead of rewriting the file.
+        Returns the record's 'creation_timestamp', or None if it was not added (see _add_records).
+        """
+        return self._add_records(filepath, [record_data])[0]
+
     def _update_record_by_timestamp(self, filepath, record_timestamp, updated_data):
         """
         Generic method to update a record in a JSON file by its 'creation_timestamp'.
         Returns True if successful, False otherwise.
         """
-        records = self._load_data(filepath)
-        found = False
-        for i, record in enumerate(records):
-            if record.get("creation_timestamp") == record_timestamp:
-                # Ensure the updated_data retains the original creation_timestamp
-                # as it's the key identifier for the record.
-                updated_data["creation_timestamp"] = record_timestamp
-                records[i] = updated_data
-                found = True
-                break
-        if found:
-            self._save_data(filepath, records)
-            return True
-        return False
+        return self._update_records_by_timestamp(filepath, [(record_timestamp, updated_data)])[0]
 
     def _delete_record_by_timestamp(self, filepath, record_timestamp):
         """
         Generic method to delete a record from a JSON file by its 'creation_timestamp'.
         Returns True if successful, False otherwise.
         """
-        records = self._load_data(filepath)
-        initial_len = len(records)
-        records = [record for record in records if record.get("creation_timestamp") != record_timestamp]
-        if len(records) < initial_len:
-            self._save_data(filepath, records)
+        return self._delete_records_by_timestamp(filepath, [record_timestamp])[0]
+
+    def _add_records(self, filepath, records):
+        """
+        Generic method to append several records with a single write.
+        Returns the 'creation_timestamp' of each record, in order, or None for a record that was
+        rejected because its caller-supplied 'creation_timestamp' is already taken.
+        """
+        records = [self._add_creation_timestamp(record_data) for record_data in records]
+        if not records:
+            return []
+        results = []
+        added = []
+        with self._lock:
+            index = self._record_index(filepath)
+            for record_data in records:
+                record_timestamp = record_data["creation_timestamp"]
+                if isinstance(record_timestamp, str) and record_timestamp in index:
+                    results.append(None)
+                    continue
+                # Cached copy, so later edits to the caller's dict don't leak in
+                self._put_record(filepath, self._index_key(index, record_data), self._make_record(filepath, record_data))
+                added.append(record_data)
+                results.append(record_timestamp)
+            if added:
+                self._persist_changes(filepath, [{"op": "add", "record": record_data} for record_data in added])
+        return results
+
+    def _update_records_by_timestamp(self, filepath, updates):
+        """
+        Generic method to apply several updates with a single write.
+        `updates` is an iterable of (record_timestamp, updated_data) pairs.
+        Returns a list of booleans telling whether each record was found and updated.
+        """
+        results = []
+        ops = []
+        with self._lock:
+            index = self._record_index(filepath)
+            for record_timestamp, updated_data in updates:
+                if record_timestamp not in index:
+                    results.append(False)
+                    continue
+                # Ensure the updated_data retains the original creation_timestamp
+                # as it's the key identifier for the record.
+                updated_data["creation_timestamp"] = record_timestamp
+                self._put_record(filepath, record_timestamp, self._make_record(filepath, updated_data)) # Keeps the record's position
+                ops.append({"op": "update", "creation_timestamp": record_timestamp, "record": updated_data})
+                results.append(True)
+            if ops:
+                self._persist_changes(filepath, ops)
+        return results
+
+    def _delete_records_by_timestamp(self, filepath, record_timestamps):
+        """
+        Generic method to delete several records with a single write.
+        Returns a list of booleans telling whether each record was found and deleted.
+        """
+        results = []
+        ops = []
+        with self._lock:
+            index = self._record_index(filepath)
+            for record_timestamp in record_timestamps:
+                if record_timestamp not in index:
+                    results.append(False)
+                    continue
+                self._pop_record(filepath, record_timestamp)
+                ops.append({"op": "delete", "creation_timestamp": record_timestamp})
+                results.append(True)
+            if ops:
+                self._persist_changes(filepath, ops)
+        return results
+
+    def _put_record(self, filepath, key, record):
+        """
+        Inserts or replaces a record in the cached collection, keeping derived indexes in step.
+        Callers must hold the lock and have loaded the collection.
+        """
+        entry = self._cache[self._storage_path(filepath)]
+        old_record = entry["index"].get(key)
+        entry["index"][key] = record
+        if "search" in entry:
+            self._search.add(self._collection_names[filepath], key, record)
+            self._search_dirty = True
+        elif "search_base" in entry:
+            entry.setdefault("search_changes", set()).add(key)
+        if "shard_of" in entry:
+            self._move_to_shard(entry, key, self._shard_name(filepath, record))
+        columns = entry.get("columns")
+        if columns is not None:
+            if old_record is not None:
+                columns.remove(key, old_record)
+            columns.insert(key, record)
+        stats = entry.get("stats")
+        if stats is not None:
+            if old_record is not None:
+                stats.remove(old_record)
+            stats.add(record)
+        dates = entry.get("dates")
+        if dates is not None:
+            if old_record is not None:
+                self._remove_date_entry(dates, (self._date_key(filepath, old_record), key))
+            insort(dates, (self._date_key(filepath, record), key))
+
+    def _pop_record(self, filepath, key):
+        """Removes a record from the cached collection, keeping derived indexes in step."""
+        entry = self._cache[self._storage_path(filepath)]
+        record = entry["index"].pop(key)
+        if "search" in entry:
+            self._search.remove(self._collection_names[filepath], key)
+            self._search_dirty = True
+        elif "search_base" in entry:
+            entry.setdefault("search_changes", set()).add(key)
+        if "shard_of" in entry:
+            self._move_to_shard(entry, key, None)
+        columns = entry.get("columns")
+        if columns is not None:
+            columns.remove(key, record)
+        stats = entry.get("stats")
+        if stats is not None:
+            stats.remove(record)
+        dates = entry.get("dates")
+        if dates is not None:
+            self._remove_date_entry(dates, (self._date_key(filepath, record), key))
+        return record
+
+
+    # --- Date-range queries ---
+    def _collection_path(self, collection):
+        """Maps a collection name (see COLLECTIONS) to its file path."""
+        try:
+            return self._collection_files[collection]
+        except KeyError:
+            raise ValueError(f"Unknown collection '{collection}'. Expected one of {self.COLLECTIONS}.") from None
+
+    def _date_key(self, filepath, record):
+        """Returns a record's date as a sortable string ('' if it has none)."""
+        value = record.get(self._date_fields[filepath])
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        return str(value) if value is not None else ""
+
+    def _remove_date_entry(self, dates, date_entry):
+        """Removes one (date, key) entry from a sorted date index by binary search."""
+        position = bisect_left(dates, date_entry)
+        if position < len(dates) and dates[position] == date_entry:
+            del dates[position]
+
+    def _date_index(self, filepath):
+        """
+        Returns the sorted date index of a collection: a list of (date, key) tuples ordered by
+        date, then creation_timestamp. Built once per load, then maintained by bisect insertion.
+        """
+        with self._lock:
+            index = self._record_index(filepath)
+            entry = self._cache[self._storage_path(filepath)]
+            if "dates" not in entry:
+                entry["dates"] = sorted((self._date_key(filepath, record), key) for key, record in index.items())
+            return entry["dates"]
+
+    def _date_bound(self, value):
+        """Normalizes a query bound (a 'YYYY-MM-DD' string or a date) to a string."""
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        return str(value)
+
+    def query(self, collection, start_date=None, end_date=None, limit=None, order="asc"):
+        """
+        Returns the records of a collection whose date lies between start_date and end_date
+        (inclusive; None leaves that side open), sorted by date and then creation_timestamp.
+        `order` is "asc" or "desc"; `limit` keeps only the first records in that order
+        (so order="desc", limit=10 gives the ten most recent). Costs O(log n + k).
+        """
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Unknown order '{order}'. Expected 'asc' or 'desc'.")
+        filepath = self._collection_path(collection)
+        if self.storage != "sharded" or (start_date is None and end_date is None):
+            self._record_index(filepath) # Loads without holding the lock
+        with self._lock:
+            if self.storage == "sharded" and (start_date is not None or end_date is not None) \
+                    and not self._cache_is_valid(self._storage_path(filepath)):
+                # Answer from the month shards in range instead of loading the whole collection
+                return self._query_shards(filepath, start_date, end_date, limit, order)
+            index = self._record_index(filepath)
+            dates = self._date_index(filepath)
+            low = 0 if start_date is None else bisect_left(dates, (self._date_bound(start_date),))
+            # '\uffff' sorts after any time suffix, so an end date includes timestamps on that day
+            high = len(dates) if end_date is None else bisect_right(dates, (self._date_bound(end_date) + "\uffff",))
+            if limit is not None and high - low > limit:
+                if order == "asc":
+                    high = low + max(limit, 0)
+                else:
+                    low = high - max(limit, 0)
+            selected = dates[low:high]
+            if order == "desc":
+                selected.reverse()
+            return [index[key] for _, key in selected]
+
+
+    # --- Columnar numeric views ---
+    BA_NUMERIC_FIELDS = {
+        "predicted_pleasure": "Predicted Pleasure",
+        "actual_pleasure": "Actual Pleasure",
+        "predicted_mastery": "Predicted Mastery",
+        "actual_mastery": "Actual Mastery",
+    }
+
+    def get_behavioral_activation_columns(self):
+        """
+        Returns the behavioral activation ratings as NumericColumns (see columnar.py): a "date"
+        ordinal column plus predicted/actual pleasure and mastery, sorted by date.
+        Built once per load and then updated in place on every add, update and delete, so plots
+        and statistics can take NumPy views of it instead of building a DataFrame of the records.
+        """
+        filepath = self.behavioral_activation_file
+        self._record_index(filepath) # Loads without holding the lock
+        with self._lock:
+            index = self._record_index(filepath)
+            entry = self._cache[self._storage_path(filepath)]
+            if "columns" not in entry:
+                entry["columns"] = NumericColumns(self._date_fields[filepath], self.BA_NUMERIC_FIELDS, index.items())
+            return entry["columns"]
+
+
+    # --- Running statistics ---
+    def _build_statistics(self, filepath, records):
+        return self._stats_types[filepath](self._date_fields[filepath], records)
+
+    def get_statistics(self, collection):
+        """
+        Returns the running aggregates of a collection (see aggregates.py): counts per day and per
+        week, plus mean pleasure/mastery gaps for activities, mean intensity drop per emotion for
+        thought records and counts per status for problems.
+        Built once per load and then updated in O(1) on every add, update and delete, so summaries
+        can read them instead of going over every record. The object is shared; do not modify it.
+        """
+        filepath = self._collection_path(collection)
+        self._record_index(filepath) # Loads without holding the lock
+        with self._lock:
+            index = self._record_index(filepath)
+            entry = self._cache[self._storage_path(filepath)]
+            if "stats" not in entry:
+                entry["stats"] = self._build_statistics(filepath, index.values())
+            return entry["stats"]
+
+    def rebuild_statistics(self, collection):
+        """Recomputes a collection's statistics from all of its records and returns them."""
+        filepath = self._collection_path(collection)
+        with self._lock:
+            index = self._record_index(filepath)
+            entry = self._cache[self._storage_path(filepath)]
+            entry["stats"] = self._build_statistics(filepath, index.values())
+            return entry["stats"]
+
+    def verify_statistics(self, collection):
+        """Checks the running statistics of a collection against a full recomputation. Returns True if they match."""
+        filepath = self._collection_path(collection)
+        with self._lock:
+            running = self.get_statistics(collection)
+            return running.matches(self._build_statistics(filepath, self._load_data(filepath)))
+
+
+    # --- Full-text search ---
+    # Free-text fields indexed for search(), per collection
+    SEARCH_FIELDS = {
+        "thought_records": ("Situation", "Automatic Thoughts", "Evidence For", "Evidence Against", "Alternative Thought"),
+        "behavioral_activation_activities": ("Activity Name", "Notes"),
+        "problem_solving_records": ("Problem Description", "Action Plan", "Outcome/Review"),
+    }
+
+    def _json_signature(self, signature):
+        """Converts a file signature to its JSON form (tuples become lists), as stored in the search index file."""
+        return json.loads(json.dumps(signature))
+
+    def _search_index(self):
+        """
+        Returns the search index, loading it from search_index.json on first use. The file is
+        parsed without the lock; call this before taking it.
+        """
+        if self._search is None:
+            data = None
+            if self.search_index_file and os.path.exists(self.search_index_file):
+                try:
+                    with open(self.search_index_file, 'r') as f:
+                        data = json.load(f)
+                except (json.JSONDecodeError, OSError) as e:
+                    print(f"Warning: could not read {self.search_index_file}: {e}. Rebuilding the search index.")
+            search = SearchIndex.from_dict(self.SEARCH_FIELDS, data)
+            with self._lock:
+                if self._search is None:
+                    self._search = search
+                    if not (self.write_behind or self.snapshots):
+                        atexit.register(self.flush) # Saves the index; __init__ registered this already otherwise
+        return self._search
+
+    def _sync_search(self, filepath):
+        """Makes sure the search index covers a collection as it is cached (see _attach_search)."""
+        self._record_index(filepath)
+        self._search_index()
+        with self._lock:
+            self._record_index(filepath)
+            self._attach_search(filepath)
+
+    def _attach_search(self, filepath, incremental_only=False):
+        """
+        Brings the search index in line with a cached collection, on the first search after it was
+        loaded. If the saved index was built from the file as loaded (same signature), only the
+        records changed since ("search_changes", noted by _put_record/_pop_record) are re-indexed;
+        otherwise the whole collection is. From then on _put_record/_pop_record keep it in step.
+        With incremental_only=True (used when saving), a collection that would need a full
+        re-index is left alone and False is returned. Needs the lock and a loaded index.
+        """
+        path = self._storage_path(filepath)
+        entry = self._cache[path]
+        if "search" in entry:
             return True
-        return False
+        index = entry["index"]
+        search = self._search
+        collection = self._collection_names[filepath]
+        base = entry.get("search_base")
+        reusable = base is not None and search.signatures.get(collection) == self._json_signature(base)
+        if reusable:
+            for key in entry.get("search_changes", ()):
+                record = index.get(key)
+                if record is None:
+                    search.remove(collection, key)
+                else:
+                    search.add(collection, key, record)
+                self._search_dirty = True
+            entry.pop("search_changes", None)
+            reusable = search.keys(collection) == index.keys()
+        if not reusable:
+            if incremental_only:
+                return False
+            search.rebuild(collection, index.items())
+            self._search_dirty = True
+        entry["search"] = True
+        return True
+
+    def _search_record(self, filepath, key):
+        """Returns the record a search hit refers to, or None if it is gone."""
+        return self._record_index(filepath).get(key)
+
+    def search(self, text, limit=50, collections=None):
+        """
+        Full-text search over the free-text fields of all collections (or of `collections`).
+        Every word of `text` must match; a word ending in '*', and the last word, also match as a
+        prefix. Returns up to `limit` (collection, key, record) triples, most relevant first (BM25).
+        `key` is the record's key in the search index, unique within its collection even for
+        older records without a creation_timestamp.
+        """
+        collections = tuple(collections or self.COLLECTIONS)
+        for collection in collections:
+            self._sync_search(self._collection_path(collection)) # Loads without holding the lock
+        with self._lock:
+            for collection in collections:
+                self._sync_search(self._collection_path(collection)) # No-op unless reloaded meanwhile
+            hits = self._search_index().search(text, limit, collections)
+            results = []
+            for _, collection, key in hits:
+                record = self._search_record(self._collection_path(collection), key)
+                if record is not None:
+                    results.append((collection, key, record))
+            return results
+
+    def _save_search_index(self):
+        """
+        Writes the search index next to the data files if it changed. Each collection is saved with
+        the signature of its file, so the next start can reuse it; collections changed since without
+        being written to disk yet are saved without one and re-indexed next time.
+        """
+        if not self.search_index_file:
+            return
+        with self._lock:
+            changed = [filepath for filepath in self._collection_files.values()
+                       if self._cache.get(self._storage_path(filepath), {}).get("search_changes")]
+        if changed and (self._search is not None or os.path.exists(self.search_index_file)):
+            # Changes made without a search since the collection was loaded: update the saved
+            # index for them now, so the next start can reuse it instead of re-indexing
+            self._search_index()
+            with self._lock:
+                for filepath in changed:
+                    entry = self._cache.get(self._storage_path(filepath))
+                    if entry is not None and "search_base" in entry:
+                        self._attach_search(filepath, incremental_only=True)
+        with self._lock:
+            if self._search is None or not self._search_dirty:
+                return
+            for collection, filepath in self._collection_files.items():
+                path = self._storage_path(filepath)
+                entry = self._cache.get(path)
+                # Collections edited since they were indexed got a None signature from SearchIndex.add/remove
+                if entry is not None and "search" in entry and path not in self._dirty and self._cache_is_valid(path):
+                    self._search.signatures[collection] = self._json_signature(entry["signature"])
+            data = json.dumps(self._search.to_dict(), separators=(",", ":"))
+            self._search_dirty = False
+        temp_path = self._temp_path(self.search_index_file)
+        try:
+            with open(temp_path, 'w') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._replace_file(temp_path, self.search_index_file)
+        except OSError as e:
+            print(f"Error saving the search index to {self.search_index_file}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    # --- Binary snapshots (JSON mode with snapshots=True) ---
+    def _snapshot_path(self, filepath):
+        """Returns the snapshot path that goes with a collection's JSON file path."""
+        return os.path.splitext(filepath)[0] + ".snapshot"
+
+    def _load_snapshot(self, filepath, signature):
+        """
+        Returns a collection's index rebuilt from its snapshot, or None if snapshots are off or the
+        snapshot doesn't match the JSON file with the given signature. Doesn't need the lock.
+
+        A snapshot file holds two pickles: a header describing the JSON file it was taken from
+        ({"format", "fields", "size", "mtime_ns", "sha1"}), then the list of records. The header
+        is checked before the records are unpickled. A snapshot whose modification time is off
+        (e.g. the data folder was copied) is still used if the JSON content hash matches.
+        """
+        snapshot_path = self._snapshot_path(filepath)
+        if not self.snapshots or signature is None or not os.path.exists(snapshot_path):
+            return None
+        mtime_ns, size, _ = signature
+        try:
+            with open(snapshot_path, 'rb') as f:
+                header = pickle.load(f)
+                if not isinstance(header, dict) or header.get("format") != self.SNAPSHOT_FORMAT \
+                        or header.get("fields") != self._record_types[filepath].FIELDS or header.get("size") != size:
+                    return None
+                fresh = header.get("mtime_ns") == mtime_ns
+                if not fresh and (header.get("sha1") != _file_sha1(filepath) or self._file_signature(filepath) != signature):
+                    return None
+                # Unpickling creates a lot of objects at once; pausing the cyclic garbage collector,
+                # which would otherwise rescan them repeatedly, makes this about three times faster
+                collecting = gc.isenabled()
+                gc.disable()
+                try:
+                    records = pickle.load(f)
+                finally:
+                    if collecting:
+                        gc.enable()
+        except Exception as e:
+            print(f"Warning: could not read the snapshot {snapshot_path}: {e}. Loading {filepath} instead.")
+            return None
+        record_type = self._record_types[filepath]
+        if not isinstance(records, list) or not all(type(record) is record_type for record in records):
+            return None
+        if fresh: # Otherwise it is rewritten with the current modification time on the next flush
+            self._snapshot_sources[filepath] = signature
+        index = {}
+        for record in records:
+            index[self._index_key(index, record)] = record
+        return index
+
+    def _save_snapshots(self):
+        """
+        Writes a snapshot of every cached JSON collection that is on disk as cached and whose
+        snapshot is missing or stale. Records are pickled and the JSON file hashed outside the lock.
+        """
+        if not self.snapshots:
+            return
+        with self._lock:
+            pending = []
+            for filepath in self._collection_files.values():
+                entry = self._cache.get(filepath)
+                if entry is None or filepath in self._dirty or not self._cache_is_valid(filepath) \
+                        or self._snapshot_sources.get(filepath) == entry["signature"]:
+                    continue
+                pending.append((filepath, entry["signature"], list(entry["index"].values())))
+        for filepath, signature, records in pending:
+            snapshot_path = self._snapshot_path(filepath)
+            temp_path = self._temp_path(snapshot_path)
+            try:
+                sha1 = _file_sha1(filepath)
+                if self._file_signature(filepath) != signature:
+                    continue # Changed while being hashed; the next flush takes a new snapshot
+                header = {
+                    "format": self.SNAPSHOT_FORMAT,
+                    "fields": self._record_types[filepath].FIELDS,
+                    "size": signature[1],
+                    "mtime_ns": signature[0],
+                    "sha1": sha1,
+                }
+                with open(temp_path, 'wb') as f:
+                    pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._replace_file(temp_path, snapshot_path)
+                with self._lock:
+                    self._snapshot_sources[filepath] = signature
+            except Exception as e:
+                print(f"Error saving the snapshot {snapshot_path}: {e}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    # --- Journal Storage ("journal" mode) ---
+    def _journal_path(self, filepath):
+        """Returns the JSONL journal path that backs a collection's JSON file path."""
+        return os.path.splitext(filepath)[0] + ".jsonl"
+
+    def _initialize_journal(self, filepath):
+        """
+        Ensures a journal exists for the collection.
+        If an older JSON array file is present, its records are imported as 'add' operations.
+        """
+        journal_path = self._journal_path(filepath)
+        if os.path.exists(journal_path):
+            return
+        self._rewrite_journal(filepath, read_json_list(filepath, "Starting with an empty collection.") or [])
+
+    def _journal_line(self, op):
+        """Serializes a single journal operation as one compact JSON line."""
+        return json.dumps(op, separators=(",", ":"), default=json_default) + "\n"
+
+    def _write_journal_file(self, path, records):
+        """Writes records to `path` as a compacted journal (one 'add' operation per record)."""
+        with open(path, 'w') as f:
+            for record in records:
+                f.write(self._journal_line({"op": "add", "record": record}))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replay_journal(self, filepath):
+        """
+        Rebuilds a collection's record index by replaying every operation in the journal.
+        Malformed lines (e.g. a partial append after a crash) are skipped with a warning.
+        Returns (index, number of operations), without taking the lock.
+        """
+        journal_path = self._journal_path(filepath)
+        index = {}
+        lines = 0
+        if os.path.exists(journal_path):
+            with open(journal_path, 'r') as f:
+                for line_number, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        op = json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"Warning: skipping malformed line {line_number} in {journal_path}.")
+                        continue
+                    lines += 1
+                    self._apply_journal_op(filepath, index, op)
+        return index, lines
+
+    def _apply_journal_op(self, filepath, index, op):
+        """Applies a single journal operation to a record index while replaying."""
+        kind = op.get("op")
+        if kind == "add":
+            record = self._make_record(filepath, op.get("record", {}))
+            index[self._index_key(index, record)] = record
+        elif kind == "update":
+            if op.get("creation_timestamp") in index:
+                index[op["creation_timestamp"]] = self._make_record(filepath, op.get("record", {}))
+        elif kind == "delete":
+            index.pop(op.get("creation_timestamp"), None)
+
+    def _append_journal_ops(self, filepath, ops):
+        """
+        Appends operations (already applied to the cached index) to a collection's journal in
+        one write, and schedules a background compaction once dead entries reach the threshold.
+        Returns False if the append failed (the cache is dropped then).
+        """
+        journal_path = self._journal_path(filepath)
+        lines = [self._journal_line(op) for op in ops]
+        with self._lock:
+            index = self._record_index(filepath)
+            try:
+                with open(journal_path, 'a') as f:
+                    f.writelines(lines)
+            except Exception as e:
+                print(f"Error appending to {journal_path}: {e}")
+                self._cache.pop(journal_path, None)
+                return False
+            self._stamp_cache(journal_path) # The cache already holds these changes
+            if self._compacting.get(journal_path) is not None:
+                self._compacting[journal_path].extend(lines) # Replayed onto the compacted file
+            state = self._journal_state[journal_path]
+            state["lines"] += len(lines)
+            dead_entries = state["lines"] - len(index)
+            needs_compaction = dead_entries >= self.compaction_threshold and journal_path not in self._compacting
+            if needs_compaction:
+                self._compacting[journal_path] = []
+        if needs_compaction:
+            threading.Thread(target=self._compact_journal, args=(filepath,), daemon=True).start()
+        return True
+
+    def _compact_journal(self, filepath):
+        """
+        Background task: rewrites the journal so it only contains the live records.
+        Operations appended while the snapshot is being written are carried over before
+        the compacted file atomically replaces the old one.
+        """
+        journal_path = self._journal_path(filepath)
+        temp_path = journal_path + ".compact"
+        try:
+            with self._lock:
+                records = list(self._record_index(filepath).values())
+                self._compacting[journal_path] = []
+            self._write_journal_file(temp_path, records)
+            with self._lock:
+                tail = self._compacting.get(journal_path)
+                if tail is None: # The collection was rewritten meanwhile; this snapshot is stale
+                    return
+                with open(temp_path, 'a') as f:
+                    f.writelines(tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+                cache_was_valid = self._cache_is_valid(journal_path)
+                self._replace_file(temp_path, journal_path)
+                self._journal_state[journal_path]["lines"] = len(records) + len(tail)
+                if cache_was_valid: # Same records, new file: only the signature changes
+                    self._stamp_cache(journal_path)
+        except Exception as e:
+            print(f"Error compacting {journal_path}: {e}")
+        finally:
+            with self._lock:
+                self._compacting.pop(journal_path, None)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _rewrite_journal(self, filepath, records):
+        """Replaces a collection's journal with a compacted one containing exactly `records`. Returns True if successful."""
+        journal_path = self._journal_path(filepath)
+        temp_path = self._temp_path(journal_path)
+        with self._lock:
+            try:
+                self._write_journal_file(temp_path, records)
+                self._replace_file(temp_path, journal_path)
+            except Exception as e:
+                print(f"Error saving data to {journal_path}: {e}")
+                return False
+            if journal_path in self._compacting:
+                self._compacting[journal_path] = None # Tell a running compaction to discard its snapshot
+            self._journal_state[journal_path] = {"lines": len(records)}
+            self._set_cache(journal_path, self._build_index(filepath, records))
+        return True
+
+    # --- Month-sharded Storage ("sharded" mode) ---
+    SHARD_MANIFEST = "manifest.json"
+    UNDATED_SHARD = "undated"
+
+    def _shard_dir(self, filepath):
+        """Returns the directory holding a collection's month shards (e.g. data/thought_records/)."""
+        return os.path.splitext(filepath)[0]
+
+    def _shard_path(self, filepath, shard_name):
+        """Returns the file path of one shard of a collection."""
+        return os.path.join(self._shard_dir(filepath), f"{shard_name}.json")
+
+    def _manifest_path(self, filepath):
+        """Returns the path of a collection's shard manifest."""
+        return os.path.join(self._shard_dir(filepath), self.SHARD_MANIFEST)
+
+    def _shard_name(self, filepath, record):
+        """Returns the shard a record belongs to: its 'YYYY-MM' month, or 'undated'."""
+        month = self._date_key(filepath, record)[:7]
+        if len(month) == 7 and month[4] == "-" and month[:4].isdigit() and month[5:].isdigit():
+            return month
+        return self.UNDATED_SHARD
 
+    def _initialize_shards(self, filepath):
+        """
+        Ensures a collection's shard directory and manifest exist.
+        If an older JSON array file is present, its records are split into monthly shards.
+        """
+        if os.path.exists(self._manifest_path(filepath)):
+            return
+        os.makedirs(self._shard_dir(filepath), exist_ok=True)
+        self._rewrite_shards(filepath, read_json_list(filepath, "Starting with an empty collection.") or [])
+
+    def _read_manifest(self, filepath):
+        """Returns the manifest's shard table ({shard name: {"count": int}}), or {} if missing/unreadable."""
+        manifest_path = self._manifest_path(filepath)
+        if not os.path.exists(manifest_path):
+            return {}
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Warning: could not read {manifest_path}: {e}. Falling back to the shard files on disk.")
+            return {name[:-len(".json")]: {} for name in os.listdir(self._shard_dir(filepath))
+                    if name.endswith(".json") and name != self.SHARD_MANIFEST}
+        return manifest.get("shards", {}) if isinstance(manifest, dict) else {}
+
+    def _write_manifest(self, filepath, shards):
+        """Atomically writes the manifest describing a collection's shards."""
+        manifest = {"format": 1, "date_field": self._date_fields[filepath], "shards": shards}
+        manifest_path = self._manifest_path(filepath)
+        temp_path = self._temp_path(manifest_path)
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f, indent=4, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        self._replace_file(temp_path, manifest_path)
+
+    def _read_shard(self, filepath, shard_name):
+        """Parses one shard file, reusing the previous parse if the file is unchanged on disk."""
+        shard_path = self._shard_path(filepath, shard_name)
+        signature = self._file_signature(shard_path)
+        cached = self._shard_cache.get(shard_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        records = []
+        if signature is not None:
+            try:
+                with open(shard_path, 'r') as f:
+                    data = json.load(f)
+                records = [self._make_record(filepath, record) for record in data] if isinstance(data, list) else []
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"Warning: could not read shard {shard_path}: {e}. Skipping it.")
+        self._shard_cache[shard_path] = (signature, records)
+        return records
+
+    def _load_shards(self, filepath):
+        """Builds a collection's record index from all of its shards, oldest month first."""
+        index = {}
+        for shard_name in sorted(self._read_manifest(filepath)): # 'undated' sorts after the months
+            for record in self._read_shard(filepath, shard_name):
+                index[self._index_key(index, record)] = record
+        return index
+
+    def _track_shards(self, filepath):
+        """Records which shard each cached record lives in, so writes know which files to rewrite."""
+        entry = self._cache[self._storage_path(filepath)]
+        entry["shard_of"] = {}
+        entry["shards"] = {} # shard name -> ordered set (dict of key -> None) of its record keys
+        entry["dirty_shards"] = set()
+        for key, record in entry["index"].items():
+            shard_name = self._shard_name(filepath, record)
+            entry["shard_of"][key] = shard_name
+            entry["shards"].setdefault(shard_name, {})[key] = None
+
+    def _move_to_shard(self, entry, key, shard_name):
+        """Moves a record key to another shard (None removes it) and marks both shards for rewriting."""
+        old_shard = entry["shard_of"].pop(key, None)
+        if old_shard is not None:
+            entry["shards"][old_shard].pop(key, None)
+            entry["dirty_shards"].add(old_shard)
+        if shard_name is not None:
+            entry["shard_of"][key] = shard_name
+            entry["shards"].setdefault(shard_name, {})[key] = None
+            entry["dirty_shards"].add(shard_name)
+
+    def _write_shard(self, filepath, shard_name, records):
+        """Atomically writes (or removes, when empty) one shard file."""
+        shard_path = self._shard_path(filepath, shard_name)
+        if records:
+            self._replace_file(self._write_temp_json(shard_path, records), shard_path)
+        elif os.path.exists(shard_path):
+            os.remove(shard_path)
+        self._shard_cache[shard_path] = (self._file_signature(shard_path), records)
+
+    def _write_dirty_shards(self, filepath):
+        """
+        Rewrites only the shards touched since the last write, then updates the manifest.
+        Returns False if writing failed (the cache is dropped then).
+        """
+        path = self._storage_path(filepath)
+        entry = self._cache[path]
+        try:
+            for shard_name in sorted(entry["dirty_shards"]):
+                keys = entry["shards"].get(shard_name, {})
+                self._write_shard(filepath, shard_name, [entry["index"][key] for key in keys])
+                if not keys:
+                    entry["shards"].pop(shard_name, None)
+            entry["dirty_shards"].clear()
+            self._write_manifest(filepath, {name: {"count": len(keys)} for name, keys in entry["shards"].items()})
+            self._stamp_cache(path)
+        except Exception as e:
+            print(f"Error saving shards of {filepath}: {e}")
+            self._cache.pop(path, None)
+            return False
+        return True
+
+    def _rewrite_shards(self, filepath, records):
+        """Replaces all of a collection's shards with exactly `records`. Returns True if successful."""
+        path = self._storage_path(filepath)
+        with self._lock:
+            stale_shards = set(self._read_manifest(filepath))
+            self._set_cache(path, self._build_index(filepath, records))
+            self._track_shards(filepath)
+            entry = self._cache[path]
+            entry["dirty_shards"] = set(entry["shards"]) | stale_shards
+            return self._write_dirty_shards(filepath)
+
+    def _query_shards(self, filepath, start_date, end_date, limit, order):
+        """Answers a date-bounded query by reading only the month shards it covers."""
+        start = None if start_date is None else self._date_bound(start_date)
+        end = None if end_date is None else self._date_bound(end_date) + "\uffff"
+        matches = []
+        for shard_name in self._read_manifest(filepath):
+            if shard_name == self.UNDATED_SHARD:
+                if start is not None:
+                    continue # Undated records sort before any start date
+            elif (start is not None and shard_name < start[:7]) or (end is not None and shard_name > end[:7]):
+                continue
+            for record in self._read_shard(filepath, shard_name):
+                date_key = self._date_key(filepath, record)
+                if (start is None or date_key >= start) and (end is None or date_key < end):
+                    matches.append((date_key, str(record.get("creation_timestamp", "~")), record))
+        matches.sort(key=lambda match: match[:2], reverse=(order == "desc"))
+        if limit is not None:
+            matches = matches[:max(limit, 0)]
+        return [record for _, _, record in matches]
 
     # --- Behavioral Activation Management ---
     def add_behavioral_activation_activity(self, activity_data):
-        """Adds a new behavioral activation activity to the collection."""
-        activity_data = self._add_creation_timestamp(activity_data) # Add timestamp
-        activities = self.get_all_behavioral_activation_activities()
-        activities.append(activity_data)
-        self._save_data(self.behavioral_activation_file, activities)
+        """Adds a new behavioral activation activity to the collection. Returns its creation_timestamp, or None if it was not added."""
+        return self._add_record(self.behavioral_activation_file, activity_data) # Adds timestamp
 
     def get_all_behavioral_activation_activities(self):
         """Retrieves all stored behavioral activation activities."""
@@ -118,11 +1489,7 @@ class DataManager:
 
     def get_behavioral_activation_activity(self, timestamp):
         """Retrieves a single behavioral activation activity by its creation_timestamp."""
-        activities = self.get_all_behavioral_activation_activities()
-        for activity in activities:
-            if activity.get("creation_timestamp") == timestamp:
-                return activity
-        return None
+        return self._get_record_by_timestamp(self.behavioral_activation_file, timestamp)
 
     def update_behavioral_activation_activity(self, record_timestamp, updated_data):
         """Updates an existing behavioral activation activity."""
@@ -132,14 +1499,23 @@ class DataManager:
         """Deletes a behavioral activation activity."""
         return self._delete_record_by_timestamp(self.behavioral_activation_file, record_timestamp)
 
+    def add_behavioral_activation_activities(self, activities):
+        """Adds several behavioral activation activities with a single write. Returns their creation_timestamps (None for a rejected one, see _add_records)."""
+        return self._add_records(self.behavioral_activation_file, activities)
+
+    def update_behavioral_activation_activities(self, updates):
+        """Updates several behavioral activation activities from (record_timestamp, updated_data) pairs. Returns a success flag per item."""
+        return self._update_records_by_timestamp(self.behavioral_activation_file, updates)
+
+    def delete_behavioral_activation_activities(self, record_timestamps):
+        """Deletes several behavioral activation activities with a single write. Returns a success flag per item."""
+        return self._delete_records_by_timestamp(self.behavioral_activation_file, record_timestamps)
+
 
     # --- Thought Record Management ---
     def add_thought_record(self, record_data):
-        """Adds a new thought record to the collection."""
-        record_data = self._add_creation_timestamp(record_data) # Add timestamp
-        records = self.get_all_thought_records() # Renamed method call
-        records.append(record_data)
-        self._save_data(self.thought_records_file, records)
+        """Adds a new thought record to the collection. Returns its creation_timestamp, or None if it was not added."""
+        return self._add_record(self.thought_records_file, record_data) # Adds timestamp
 
     def get_all_thought_records(self): # Renamed this method
         """Retrieves all stored thought records."""
@@ -147,11 +1523,7 @@ class DataManager:
 
     def get_thought_record(self, timestamp): # NEW method for fetching single record
         """Retrieves a single thought record by its creation_timestamp."""
-        records = self.get_all_thought_records()
-        for record in records:
-            if record.get("creation_timestamp") == timestamp:
-                return record
-        return None
+        return self._get_record_by_timestamp(self.thought_records_file, timestamp)
 
     def update_thought_record(self, record_timestamp, updated_data):
         """Updates an existing thought record."""
@@ -161,14 +1533,23 @@ class DataManager:
         """Deletes a thought record."""
         return self._delete_record_by_timestamp(self.thought_records_file, record_timestamp)
 
+    def add_thought_records(self, records):
+        """Adds several thought records with a single write. Returns their creation_timestamps (None for a rejected one, see _add_records)."""
+        return self._add_records(self.thought_records_file, records)
+
+    def update_thought_records(self, updates):
+        """Updates several thought records from (record_timestamp, updated_data) pairs. Returns a success flag per item."""
+        return self._update_records_by_timestamp(self.thought_records_file, updates)
+
+    def delete_thought_records(self, record_timestamps):
+        """Deletes several thought records with a single write. Returns a success flag per item."""
+        return self._delete_records_by_timestamp(self.thought_records_file, record_timestamps)
+
 
     # --- Problem Solving Management ---
     def add_problem_solving_record(self, record_data):
-        """Adds a new problem solving record to the collection."""
-        record_data = self._add_creation_timestamp(record_data) # Add timestamp
-        records = self.get_all_problem_solving_records() # Renamed method call
-        records.append(record_data)
-        self._save_data(self.problem_solving_records_file, records)
+        """Adds a new problem solving record to the collection. Returns its creation_timestamp, or None if it was not added."""
+        return self._add_record(self.problem_solving_records_file, record_data) # Adds timestamp
 
     def get_all_problem_solving_records(self): # Renamed this method
         """Retrieves all stored problem solving records."""
@@ -176,11 +1557,7 @@ class DataManager:
 
     def get_problem_solving_record(self, timestamp): # NEW method for fetching single record
         """Retrieves a single problem solving record by its creation_timestamp."""
-        records = self.get_all_problem_solving_records()
-        for record in records:
-            if record.get("creation_timestamp") == timestamp:
-                return record
-        return None
+        return self._get_record_by_timestamp(self.problem_solving_records_file, timestamp)
 
     def update_problem_solving_record(self, record_timestamp, updated_data):
         """Updates an existing problem solving record."""
@@ -188,4 +1565,16 @@ class DataManager:
 
     def delete_problem_solving_record(self, record_timestamp):
         """Deletes a problem solving record."""
-        return self._delete_record_by_timestamp(self.problem_solving_records_file, record_timestamp)
\ No newline at end of file
+        return self._delete_record_by_timestamp(self.problem_solving_records_file, record_timestamp)
+
+    def add_problem_solving_records(self, records):
+        """Adds several problem solving records with a single write. Returns their creation_timestamps (None for a rejected one, see _add_records)."""
+        return self._add_records(self.problem_solving_records_file, records)
+
+    def update_problem_solving_records(self, updates):
+        """Updates several problem solving records from (record_timestamp, updated_data) pairs. Returns a success flag per item."""
+        return self._update_records_by_timestamp(self.problem_solving_records_file, updates)
+
+    def delete_problem_solving_records(self, record_timestamps):
+        """Deletes several problem solving records with a single write. Returns a success flag per item."""
+        return self._delete_records_by_timestamp(self.problem_solving_records_file, record_timestamps)
\ No newline at end of file
@@ -0,0 +1,84 @@
+# downsampling.py
+
+import numpy as np
+
+# Time buckets for aggregate_by_period, finest first
+PERIODS = ("day", "week", "month")
+
+def _bucket_keys(dates, period):
+    """Maps datetime64[D] dates to integer bucket keys (weeks start on Monday)."""
+    days = dates.astype("datetime64[D]").astype(np.int64)
+    if period == "day":
+        return days
+    if period == "week":
+        return (days + 3) // 7 # 1970-01-01 was a Thursday
+    if period == "month":
+        return dates.astype("datetime64[M]").astype(np.int64)
+    raise ValueError(f"Unknown period '{period}'. Expected one of {PERIODS}.")
+
+def _bucket_dates(keys, period):
+    """Returns the first day of each bucket key as datetime64[D]."""
+    if period == "day":
+        return keys.astype("datetime64[D]")
+    if period == "week":
+        return (keys * 7 - 3).astype("datetime64[D]")
+    return keys.astype("datetime64[M]").astype("datetime64[D]")
+
+def count_periods(dates, period):
+    """Returns how many buckets of `period` a sorted date array spans (i.e. points an aggregate would draw)."""
+    if not len(dates):
+        return 0
+    keys = _bucket_keys(dates, period)
+    return int(np.count_nonzero(np.diff(keys))) + 1
+
+def aggregate_by_period(dates, values, period):
+    """
+    Aggregates a date-sorted series into day/week/month buckets.
+    Returns (bucket start dates, mean, min, max); NaN values are ignored, and buckets
+    with no values get NaN. Everything is computed with reduceat, without a Python loop.
+    """
+    if not len(dates):
+        empty = np.empty(0)
+        return dates[:0], empty, empty, empty
+    keys = _bucket_keys(dates, period)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    counts = np.add.reduceat(present.astype(np.int64), starts)
+    sums = np.add.reduceat(np.where(present, values, 0.0), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(counts > 0, sums / counts, np.nan)
+    low = np.fmin.reduceat(values, starts) # fmin/fmax skip NaN unless the whole bucket is NaN
+    high = np.fmax.reduceat(values, starts)
+    return _bucket_dates(keys[starts], period), mean, low, high
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets decimation. Returns the indices of at most `threshold` points
+    of (x, y) that best preserve the shape of the line; the first and last points are always kept.
+    x must be sorted and numeric (e.g. datetime64 viewed as int64) and y free of NaN.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # threshold - 2 buckets between the fixed first and last points
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Average point of each bucket, plus the last point as the "next bucket" of the final one
+    sizes = np.diff(np.append(edges, n))
+    average_x = np.add.reduceat(x, edges) / sizes
+    average_y = np.add.reduceat(y, edges) / sizes
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Twice the area of the triangle (selected point a, candidate, next bucket's average)
+        area = np.abs((x[a] - average_x[bucket + 1]) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (average_y[bucket + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return selected
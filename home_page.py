@@ -1,5 +1,6 @@
 # home_page.py
 
+import datetime
 import tkinter as tk
 from tkinter import ttk
 
@@ -53,4 +54,45 @@ class HomePage(ttk.Frame):
 
         ttk.Button(button_frame, text="Start Learning", command=lambda: controller.show_frame("LearnPage")).grid(row=0, column=0, padx=10, pady=5, sticky="ew")
         ttk.Button(button_frame, text="Log a Thought", command=lambda: controller.show_frame("ThoughtRecordPage")).grid(row=0, column=1, padx=10, pady=5, sticky="ew")
-        ttk.Button(button_frame, text="Plan an Activity", command=lambda: controller.show_frame("BehavioralActivationPage")).grid(row=0, column=2, padx=10, pady=5, sticky="ew")
\ No newline at end of file
+        ttk.Button(button_frame, text="Plan an Activity", command=lambda: controller.show_frame("BehavioralActivationPage")).grid(row=0, column=2, padx=10, pady=5, sticky="ew")
+
+        # Summary of the user's week, read from the DataManager's running statistics
+        ttk.Label(content_frame, text="Your Week at a Glance:", font=("Helvetica", 12, "bold")).grid(row=3, column=0, pady=(20, 10), sticky="w")
+        self.summary_label = ttk.Label(content_frame, text="Loading your entries...", wraplength=700, justify="left", font=("Helvetica", 11))
+        self.summary_label.grid(row=4, column=0, padx=10, sticky="w")
+        controller.change_events.subscribe(self._on_data_changed)
+
+    def refresh_page(self):
+        """Called by app.py when this page is shown. Collections are loaded off the Tk thread the first time."""
+        self.controller.request_statistics(self._show_summary)
+
+    def _on_data_changed(self, events):
+        if self.controller.current_page == "HomePage":
+            self.refresh_page()
+
+    def _show_summary(self, statistics):
+        """Writes the week's summary from the running statistics (no pass over the records)."""
+        activities = statistics["behavioral_activation_activities"]
+        thought_records = statistics["thought_records"]
+        problems = statistics["problem_solving_records"]
+        today = datetime.date.today()
+
+        def count_of(count, singular, plural):
+            return f"{count} {singular if count == 1 else plural}"
+
+        lines = [f"This week: {count_of(activities.count_in_week(today), 'activity', 'activities')}, "
+                 f"{count_of(thought_records.count_in_week(today), 'thought record', 'thought records')} and "
+                 f"{count_of(problems.count_in_week(today), 'problem-solving entry', 'problem-solving entries')}."]
+        for gap in ("pleasure", "mastery"):
+            mean_gap = activities.mean_gap(gap)
+            if mean_gap is not None and round(mean_gap, 1):
+                direction = "more" if mean_gap > 0 else "less"
+                lines.append(f"On average, activities brought {abs(mean_gap):.1f} points {direction} {gap} than you predicted.")
+        drops = thought_records.mean_drops()
+        if drops:
+            emotion, drop = next(iter(drops.items()))
+            if drop > 0:
+                lines.append(f"Thought records eased '{emotion}' the most: {drop:.0f} points lower on average.")
+        if problems.count:
+            lines.append(f"Problems: {problems.open} open, {problems.in_progress} in progress, {problems.resolved} solved.")
+        self.summary_label.config(text="\n".join(lines))
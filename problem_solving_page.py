@@ -219,14 +219,13 @@ class ProblemSolvingPage(ttk.Frame):
             else:
                 messagebox.showerror("Error", "Failed to update problem-solving record.")
         else:
-            self.data_manager.add_problem_solving_record(self.current_record_data)
+            if not self.data_manager.add_problem_solving_record(self.current_record_data):
+                messagebox.showerror("Error", "Failed to save problem-solving record. Please try again.")
+                return
             messagebox.showinfo("Success", "Problem-Solving record saved successfully!")
         
         self._clear_form()
         self.controller.show_frame("ProgressPage") # Go back to progress page after save/update
-        # Refresh progress page if it's visible, the refresh_page method will handle which tab
-        if "ProgressPage" in self.controller.frames:
-            self.controller.frames["ProgressPage"].refresh_page()
 
 
     def _clear_form(self):
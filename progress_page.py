@@ -1,28 +1,65 @@
 # progress_page.py
 
+import queue
+import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
+from tkcalendar import DateEntry
 from datetime import datetime
 
+# matplotlib, numpy and downsampling (which needs numpy) are the heaviest imports of the app, so
+# they are only imported when the Activity Trends tab is first shown (see _build_trends_chart)
+from change_events import BULK_CHANGED, DELETED, EXTERNALLY_RELOADED
+from search_index import normalize
+from virtual_treeview import VirtualTreeview
+
 class ProgressPage(ttk.Frame):
+    LOAD_CHUNK_SIZE = 500 # Rows prepared per message from the loader thread
+    LOAD_POLL_MS = 30 # How often the Tk main loop checks for loaded rows
+    FILTER_DEBOUNCE_MS = 250 # Quiet time after the last keystroke before a filter runs
+    FILTER_CHUNK_SIZE = 5000 # Rows matched per Tk callback, so typing stays responsive
+    # Trend lines: (column in the DataManager's BA columns, label, marker, line style)
+    BA_TREND_SERIES = (
+        ("predicted_pleasure", "Predicted Pleasure", 'o', '-'),
+        ("actual_pleasure", "Actual Pleasure", 'o', '--'),
+        ("predicted_mastery", "Predicted Mastery", 'x', '-'),
+        ("actual_mastery", "Actual Mastery", 'x', '--'),
+    )
+    PLOT_RESOLUTIONS = ("Auto", "Activities", "Daily", "Weekly", "Monthly")
+    PERIOD_ADJECTIVES = {"day": "daily", "week": "weekly", "month": "monthly"}
+    PIXELS_PER_POINT = 2 # Point budget per line = plot width in pixels / PIXELS_PER_POINT
+
     def __init__(self, parent, controller, data_manager):
         super().__init__(parent)
         self.controller = controller
         self.data_manager = data_manager
 
-        # Dictionaries to map Treeview item IDs to full record data for each type
+        # Dictionaries to map Treeview row IDs to full record data for each type (in display order)
         self.ba_activity_data_map = {}
         self.thought_record_data_map = {}
         self.problem_solving_data_map = {}
+        # Display values of each row, prepared by the loader thread (row ID -> tuple)
+        self.ba_activity_rows = {}
+        self.thought_record_rows = {}
+        self.problem_solving_rows = {}
+
+        # Log tabs are loaded on a worker thread; rows come back in chunks through _load_queue
+        self._loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="progress-loader")
+        self._load_queue = queue.Queue()
+        self._load_job = None # The load in progress, if any (see _load_log)
 
         self.grid_rowconfigure(0, weight=0) # Title
         self.grid_rowconfigure(1, weight=1) # Notebook/content area
+        self.grid_rowconfigure(2, weight=0) # Loading indicator
         self.grid_columnconfigure(0, weight=1)
 
-        ttk.Label(self, text="Your Progress & Logs", font=("Helvetica", 16, "bold")).grid(row=0, column=0, pady=10, sticky="ew")
+        header_frame = ttk.Frame(self)
+        header_frame.grid(row=0, column=0, pady=10, sticky="ew")
+        ttk.Label(header_frame, text="Your Progress & Logs", font=("Helvetica", 16, "bold")).grid(row=0, column=0, sticky="w")
+        # One-line summary from the DataManager's running statistics (see _refresh_summary)
+        self.summary_label = ttk.Label(header_frame, text="", foreground="gray")
+        self.summary_label.grid(row=1, column=0, sticky="w")
 
         self.notebook = ttk.Notebook(self)
         self.notebook.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
@@ -47,17 +84,67 @@ class ProgressPage(ttk.Frame):
         self.notebook.add(self.problem_solving_log_frame, text="Problem Solving Log")
         self._setup_problem_solving_tab()
 
+        # --- Loading indicator, only shown while a log tab is loading ---
+        self.load_status_frame = ttk.Frame(self)
+        self.load_status_frame.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 10))
+        self.load_status_frame.grid_columnconfigure(1, weight=1)
+        self.load_status_label = ttk.Label(self.load_status_frame, text="Loading...")
+        self.load_status_label.grid(row=0, column=0, padx=(0, 10))
+        self.load_progressbar = ttk.Progressbar(self.load_status_frame, mode="determinate")
+        self.load_progressbar.grid(row=0, column=1, sticky="ew")
+        ttk.Button(self.load_status_frame, text="Cancel", command=self._cancel_log_load).grid(row=0, column=2, padx=(10, 0))
+        self.load_status_frame.grid_remove()
+
+        # Everything the loader and the keyed refresh need to know about each log tab
+        self._log_tabs = {
+            "Activity Log": {
+                "collection": "behavioral_activation_activities", "tree": self.ba_tree,
+                "data_map": self.ba_activity_data_map, "rows": self.ba_activity_rows,
+                "format_row": self._format_ba_row, "fallback_prefix": "no_timestamp",
+                "search_fields": ("Activity Name", "Notes"), "date_field": "Activity Date",
+                "status_field": None,
+            },
+            "Thought Records Log": {
+                "collection": "thought_records", "tree": self.thought_records_tree,
+                "data_map": self.thought_record_data_map, "rows": self.thought_record_rows,
+                "format_row": self._format_thought_record_row, "fallback_prefix": "no_timestamp_tr",
+                "search_fields": ("Situation", "Automatic Thoughts", "Alternative Thought"), "date_field": "Date",
+                "status_field": None,
+            },
+            "Problem Solving Log": {
+                "collection": "problem_solving_records", "tree": self.problem_solving_tree,
+                "data_map": self.problem_solving_data_map, "rows": self.problem_solving_rows,
+                "format_row": self._format_problem_solving_row, "fallback_prefix": "no_timestamp_ps",
+                "search_fields": ("Problem Description", "Chosen Solution"), "date_field": "Date",
+                "status_field": "Problem Status",
+                "status_values": ("Open", "Partially Solved", "Solved", "Abandoned", "N/A"),
+            },
+        }
+        for tab, spec in self._log_tabs.items():
+            spec["version"] = 0 # Bumped whenever the tab's rows change; invalidates cached sort orders
+            spec["data_version"] = None # DataManager version of the collection the rows were loaded from
+            spec["sort"] = None # (column, descending) once a heading was clicked
+            spec["sort_cache"] = {} # column -> ascending permutation of row IDs, for spec["sort_cache"]["version"]
+            spec["headings"] = {column: spec["tree"].heading(column, option="text") for column in spec["tree"].tree["columns"]}
+            for column in spec["headings"]:
+                spec["tree"].heading(column, command=lambda tab=tab, column=column: self._sort_log(tab, column))
+            self._build_filter_bar(tab, spec)
+
         self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_change)
+        # Changes saved anywhere in the app are pushed here (see _on_data_changed)
+        self.controller.change_events.subscribe(self._on_data_changed)
 
     # --- Behavioral Activation Log Tab Setup (Existing) ---
     def _setup_ba_log_tab(self):
-        self.ba_log_frame.grid_rowconfigure(0, weight=1) # Treeview
-        self.ba_log_frame.grid_rowconfigure(1, weight=0) # Buttons
+        self.ba_log_frame.grid_rowconfigure(0, weight=0) # Filter bar (see _build_filter_bar)
+        self.ba_log_frame.grid_rowconfigure(1, weight=1) # Treeview
+        self.ba_log_frame.grid_rowconfigure(2, weight=0) # Buttons
         self.ba_log_frame.grid_columnconfigure(0, weight=1)
 
         # Treeview for displaying BA activities
         columns = ("Date", "Activity", "Pred. Pleasure", "Act. Pleasure", "Pred. Mastery", "Act. Mastery", "Notes")
-        self.ba_tree = ttk.Treeview(self.ba_log_frame, columns=columns, show="headings")
+        # Virtualized: only the rows on screen exist as Tk items, so long histories open instantly
+        self.ba_tree = VirtualTreeview(self.ba_log_frame, columns, self._ba_row_values, selectmode="extended") # Multi-select for bulk delete
 
         # Define headings
         self.ba_tree.heading("Date", text="Date")
@@ -77,16 +164,11 @@ class ProgressPage(ttk.Frame):
         self.ba_tree.column("Act. Mastery", width=60, anchor="center")
         self.ba_tree.column("Notes", width=250)
 
-        self.ba_tree.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
-
-        # Scrollbar for the Treeview
-        scrollbar = ttk.Scrollbar(self.ba_log_frame, orient="vertical", command=self.ba_tree.yview)
-        self.ba_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.ba_tree.grid(row=1, column=0, sticky="nsew", padx=5, pady=5) # Has its own scrollbar
 
         # Buttons for actions
         button_frame = ttk.Frame(self.ba_log_frame)
-        button_frame.grid(row=1, column=0, columnspan=2, pady=10)
+        button_frame.grid(row=2, column=0, columnspan=2, pady=10)
         button_frame.grid_columnconfigure(0, weight=1)
         button_frame.grid_columnconfigure(1, weight=1)
         button_frame.grid_columnconfigure(2, weight=1)
@@ -96,43 +178,26 @@ class ProgressPage(ttk.Frame):
         ttk.Button(button_frame, text="Refresh List", command=self.populate_ba_treeview).grid(row=0, column=2, padx=10)
 
         # Double-click to edit
-        self.ba_tree.bind("<Double-1>", lambda event: self._edit_selected_activity())
+        self.ba_tree.tree.bind("<Double-1>", lambda event: self._edit_selected_activity())
 
 
     def populate_ba_treeview(self):
-        # Clear existing items
-        for item in self.ba_tree.get_children():
-            self.ba_tree.delete(item)
+        # Activities are fetched (sorted by date, then creation_timestamp) and formatted in the background
+        self._load_log("Activity Log")
 
-        # Clear the data map before repopulating
-        self.ba_activity_data_map.clear()
+    def _ba_row_values(self, item_id):
+        return self.ba_activity_rows[item_id]
 
-        # Get all activities
-        activities = self.data_manager.get_all_behavioral_activation_activities()
-        
-        # Sort activities by date, then by creation_timestamp for consistent ordering
-        activities.sort(key=lambda x: (x.get("Activity Date", ""), x.get("creation_timestamp", "")))
-
-        # Insert new data
-        for activity in activities:
-            item_id = activity.get("creation_timestamp") # Use creation_timestamp as unique item ID
-            
-            # If for some reason a record doesn't have a timestamp (older data), create a unique one
-            if item_id is None:
-                item_id = f"no_timestamp_{id(activity)}_{datetime.now().microsecond}"
-                activity["creation_timestamp"] = item_id # Add it to the activity for consistent lookup
-
-            self.ba_tree.insert("", "end", iid=item_id, values=(
-                activity.get("Activity Date", "N/A"),
-                activity.get("Activity Name", "N/A"),
-                activity.get("Predicted Pleasure", "N/A"),
-                activity.get("Actual Pleasure", "N/A"),
-                activity.get("Predicted Mastery", "N/A"),
-                activity.get("Actual Mastery", "N/A"),
-                activity.get("Notes", "")
-            ))
-            # Store the full activity data in our map
-            self.ba_activity_data_map[item_id] = activity
+    def _format_ba_row(self, activity):
+        return (
+            activity.get("Activity Date", "N/A"),
+            activity.get("Activity Name", "N/A"),
+            activity.get("Predicted Pleasure", "N/A"),
+            activity.get("Actual Pleasure", "N/A"),
+            activity.get("Predicted Mastery", "N/A"),
+            activity.get("Actual Mastery", "N/A"),
+            activity.get("Notes", "")
+        )
 
 
     def _edit_selected_activity(self):
@@ -151,7 +216,7 @@ class ProgressPage(ttk.Frame):
             return
         
         # Pass the data to the BehavioralActivationPage for loading
-        self.controller.show_frame("BehavioralActivationPage", initial_data=activity_data, record_timestamp=activity_data.get("creation_timestamp"))
+        self.controller.show_frame("BehavioralActivationPage", initial_data=activity_data.copy(), record_timestamp=activity_data.get("creation_timestamp"))
 
 
     def _delete_selected_activity(self):
@@ -160,86 +225,191 @@ class ProgressPage(ttk.Frame):
             messagebox.showwarning("No Selection", "Please select an activity to delete.")
             return
 
-        confirm = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected activity?")
+        count = len(selected_items)
+        prompt = "Are you sure you want to delete the selected activity?" if count == 1 else f"Are you sure you want to delete the {count} selected activities?"
+        confirm = messagebox.askyesno("Confirm Delete", prompt)
         if confirm:
-            item_id = selected_items[0] # Get the iid of the selected item
-            
-            # Retrieve the full activity data from our map
-            activity_data = self.ba_activity_data_map.get(item_id)
-
-            if activity_data is None:
-                messagebox.showerror("Error", "Could not retrieve activity data for deletion.")
-                return
-
-            record_timestamp = activity_data.get("creation_timestamp")
-
-            if record_timestamp:
-                success = self.data_manager.delete_behavioral_activation_activity(record_timestamp)
-                if success:
-                    messagebox.showinfo("Deleted", "Activity deleted successfully.")
-                    # Remove from our map as well
-                    self.ba_activity_data_map.pop(item_id, None)
-                    self.populate_ba_treeview() # Refresh list
-                    self.plot_ba_trends() # Refresh plot
-                else:
-                    messagebox.showerror("Error", "Failed to delete activity. Record not found in data manager.")
+            record_timestamps = []
+            for item_id in selected_items:
+                # Retrieve the full activity data from our map
+                activity_data = self.ba_activity_data_map.get(item_id)
+                if activity_data is None:
+                    messagebox.showerror("Error", "Could not retrieve activity data for deletion.")
+                    return
+                record_timestamp = activity_data.get("creation_timestamp")
+                if not record_timestamp:
+                    messagebox.showerror("Error", "Cannot delete activity: No unique timestamp found for this record.")
+                    return
+                record_timestamps.append(record_timestamp)
+
+            # All selected activities are deleted with a single write
+            results = self.data_manager.delete_behavioral_activation_activities(record_timestamps)
+            deleted_count = sum(results)
+            if deleted_count == count:
+                messagebox.showinfo("Deleted", "Activity deleted successfully." if count == 1 else f"{count} activities deleted successfully.")
+            elif deleted_count:
+                messagebox.showwarning("Partially Deleted", f"{deleted_count} of {count} activities were deleted. The rest were not found in data manager.")
             else:
-                messagebox.showerror("Error", "Cannot delete activity: No unique timestamp found for this record.")
+                messagebox.showerror("Error", "Failed to delete activity. Record not found in data manager.")
+            # The log and the trends chart are updated by the change event (see _on_data_changed)
 
 
     # --- Behavioral Activation Trends Tab Setup (Existing) ---
     def _setup_ba_trends_tab(self):
-        self.ba_trends_frame.grid_rowconfigure(0, weight=1)
+        self.ba_trends_frame.grid_rowconfigure(0, weight=0) # Resolution picker
+        self.ba_trends_frame.grid_rowconfigure(1, weight=1) # Plot
         self.ba_trends_frame.grid_columnconfigure(0, weight=1)
-        
-        self.fig, self.ax = plt.subplots(figsize=(8, 6))
+
+        controls = ttk.Frame(self.ba_trends_frame)
+        controls.grid(row=0, column=0, sticky="w", padx=10, pady=(10, 0))
+        ttk.Label(controls, text="Resolution:").grid(row=0, column=0, padx=(0, 5))
+        self.plot_resolution_var = tk.StringVar(value="Auto")
+        resolution_box = ttk.Combobox(controls, textvariable=self.plot_resolution_var, values=self.PLOT_RESOLUTIONS, state="readonly", width=12)
+        resolution_box.grid(row=0, column=1)
+        resolution_box.bind("<<ComboboxSelected>>", lambda event: self.plot_ba_trends())
+
+        # Placeholder until the tab is first shown and the chart is built
+        self.fig = None
+        self.trends_placeholder = ttk.Label(self.ba_trends_frame, text="Loading chart...", anchor="center")
+        self.trends_placeholder.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+
+    def _build_trends_chart(self):
+        """Imports the plotting stack and builds the trends figure. Called once, on first display."""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.collections import PolyCollection
+        from matplotlib.figure import Figure
+
+        # Built without pyplot, so the figure isn't registered in (and kept alive by) pyplot's global state
+        self.fig = Figure(figsize=(8, 6))
+        self.ax = self.fig.add_subplot()
         self.canvas_plot = FigureCanvasTkAgg(self.fig, master=self.ba_trends_frame)
         self.canvas_widget = self.canvas_plot.get_tk_widget()
-        self.canvas_widget.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
-        
-        self.plot_ba_trends() # Initial plot
-
-    def plot_ba_trends(self):
-        """Plots the trends for Behavioral Activation activities."""
-        self.ax.clear() # Clear previous plot
-
-        activities = self.data_manager.get_all_behavioral_activation_activities()
-        if not activities:
-            self.ax.text(0.5, 0.5, "No Behavioral Activation data to plot.",
-                          horizontalalignment='center', verticalalignment='center',
-                          transform=self.ax.transAxes, fontsize=12)
-            self.canvas_plot.draw()
-            return
-
-        df = pd.DataFrame(activities)
-        df["Activity Date"] = pd.to_datetime(df["Activity Date"])
-        df = df.sort_values(by="Activity Date")
-
-        # Plotting Predicted vs Actual Pleasure
-        self.ax.plot(df["Activity Date"], df["Predicted Pleasure"], marker='o', linestyle='-', label="Predicted Pleasure")
-        self.ax.plot(df["Activity Date"], df["Actual Pleasure"], marker='o', linestyle='--', label="Actual Pleasure")
-
-        # Plotting Predicted vs Actual Mastery
-        self.ax.plot(df["Activity Date"], df["Predicted Mastery"], marker='x', linestyle='-', label="Predicted Mastery")
-        self.ax.plot(df["Activity Date"], df["Actual Mastery"], marker='x', linestyle='--', label="Actual Mastery")
-
-        self.ax.set_title("Behavioral Activation: Pleasure & Mastery Trends")
+        self.trends_placeholder.grid_remove()
+        self.canvas_widget.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+
+        # The artists are created once; plot_ba_trends only swaps their data
+        self.trend_lines = {}
+        self.trend_bands = {}
+        for name, label, marker, linestyle in self.BA_TREND_SERIES:
+            line, = self.ax.plot([], [], marker=marker, linestyle=linestyle, label=label)
+            band = PolyCollection([], facecolors=line.get_color(), alpha=0.15, linewidths=0)
+            self.ax.add_collection(band)
+            self.trend_lines[name] = line
+            self.trend_bands[name] = band
+        self.no_data_text = self.ax.text(0.5, 0.5, "No Behavioral Activation data to plot.",
+                                         horizontalalignment='center', verticalalignment='center',
+                                         transform=self.ax.transAxes, fontsize=12, visible=False)
+        self.trends_title = self.ax.set_title("Behavioral Activation: Pleasure & Mastery Trends")
+        self.ax.xaxis_date()
         self.ax.set_xlabel("Date")
         self.ax.set_ylabel("Rating (0-10)")
-        self.ax.legend()
+        self.ax.set_ylim(-0.5, 10.5)
+        self.ax.legend(loc="upper left")
         self.ax.grid(True)
         self.fig.autofmt_xdate() # Rotate dates for better readability
+        self._plotted_state = None # What the chart currently shows, see plot_ba_trends
 
-        self.canvas_plot.draw()
+    def plot_ba_trends(self):
+        """
+        Plots the trends for Behavioral Activation activities by updating the existing artists.
+        Does nothing if neither the data, the resolution nor the plot width changed since the last call.
+        """
+        if self.fig is None:
+            if self.notebook.tab(self.notebook.select(), "text") != "Activity Trends":
+                return # Built (and plotted) when the tab is first shown
+            self._build_trends_chart()
+        import matplotlib.dates as mdates
+        import numpy as np
+        from downsampling import aggregate_by_period, lttb_indices
+
+        columns = self.data_manager.get_behavioral_activation_columns() # Sorted by date
+        budget = self._plot_point_budget()
+        state = (columns, columns.version, self.plot_resolution_var.get(), budget)
+        if state == self._plotted_state:
+            return
+        self._plotted_state = state
+
+        if not len(columns):
+            for name in self.trend_lines:
+                self.trend_lines[name].set_data([], [])
+                self.trend_bands[name].set_verts([])
+            self.no_data_text.set_visible(True)
+            self.canvas_plot.draw_idle()
+            return
+        self.no_data_text.set_visible(False)
+
+        # Zero-copy views of the numeric columns; no DataFrame of the full records is needed
+        ratings = columns.as_numpy()
+        dates = columns.dates_as_numpy()
+        period = self._plot_period(dates, budget)
+
+        for name, _, _, _ in self.BA_TREND_SERIES:
+            if period is None: # Individual activities, decimated to the point budget
+                values = ratings[name]
+                present = ~np.isnan(values)
+                x, y = dates[present], values[present]
+                keep = lttb_indices(x.astype(np.int64), y, budget)
+                self.trend_lines[name].set_data(mdates.date2num(x[keep]), y[keep])
+                self.trend_bands[name].set_verts([])
+            else: # Mean per day/week/month with a min-max band
+                x, mean, low, high = aggregate_by_period(dates, ratings[name], period)
+                present = ~np.isnan(mean)
+                x, mean, low, high = x[present], mean[present], low[present], high[present]
+                keep = lttb_indices(x.astype(np.int64), mean, budget)
+                x = mdates.date2num(x[keep])
+                self.trend_lines[name].set_data(x, mean[keep])
+                band = np.column_stack((np.concatenate((x, x[::-1])), np.concatenate((high[keep], low[keep][::-1]))))
+                self.trend_bands[name].set_verts([band] if len(x) else [])
+
+        title = "Behavioral Activation: Pleasure & Mastery Trends"
+        if period is not None:
+            title += f" ({self.PERIOD_ADJECTIVES[period]} mean, min-max band)"
+        self.trends_title.set_text(title)
+
+        # Rescale only when the date range changed (ratings always span 0-10)
+        first, last = mdates.date2num(dates[0]), mdates.date2num(dates[-1])
+        margin = max(1.0, (last - first) * 0.02)
+        limits = (first - margin, last + margin)
+        if self.ax.get_xlim() != limits:
+            self.ax.set_xlim(*limits)
+
+        self.canvas_plot.draw_idle()
+
+    def _plot_point_budget(self):
+        """Maximum points drawn per line: proportional to the plot's width in pixels."""
+        width = self.canvas_widget.winfo_width()
+        if width <= 1: # Not mapped yet; use the figure's own size
+            width = int(self.fig.get_figwidth() * self.fig.dpi)
+        return max(50, width // self.PIXELS_PER_POINT)
+
+    def _plot_period(self, dates, budget):
+        """
+        Returns the aggregation period for the chosen resolution ('day', 'week', 'month'), or None
+        to plot individual activities. "Auto" plots activities while they fit the point budget,
+        then the finest period whose buckets fit it.
+        """
+        from downsampling import PERIODS, count_periods
+        resolution = self.plot_resolution_var.get()
+        if resolution == "Activities":
+            return None
+        if resolution != "Auto":
+            return {"Daily": "day", "Weekly": "week", "Monthly": "month"}[resolution]
+        if len(dates) <= budget:
+            return None
+        for period in PERIODS:
+            if count_periods(dates, period) <= budget:
+                return period
+        return PERIODS[-1] # Still too many months: LTTB caps the points drawn
 
     # --- NEW: Thought Records Tab Setup ---
     def _setup_thought_records_tab(self):
-        self.thought_records_log_frame.grid_rowconfigure(0, weight=1) # Treeview
-        self.thought_records_log_frame.grid_rowconfigure(1, weight=0) # Buttons
+        self.thought_records_log_frame.grid_rowconfigure(0, weight=0) # Filter bar (see _build_filter_bar)
+        self.thought_records_log_frame.grid_rowconfigure(1, weight=1) # Treeview
+        self.thought_records_log_frame.grid_rowconfigure(2, weight=0) # Buttons
         self.thought_records_log_frame.grid_columnconfigure(0, weight=1)
 
         columns = ("Date", "Situation", "Emotion", "Automatic Thought", "Alternative Thought")
-        self.thought_records_tree = ttk.Treeview(self.thought_records_log_frame, columns=columns, show="headings")
+        self.thought_records_tree = VirtualTreeview(self.thought_records_log_frame, columns, self._thought_record_row_values, selectmode="extended")
         
         self.thought_records_tree.heading("Date", text="Date")
         self.thought_records_tree.heading("Situation", text="Situation")
@@ -253,14 +423,10 @@ class ProgressPage(ttk.Frame):
         self.thought_records_tree.column("Automatic Thought", width=250, anchor="w")
         self.thought_records_tree.column("Alternative Thought", width=250, anchor="w")
 
-        self.thought_records_tree.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
-
-        scrollbar = ttk.Scrollbar(self.thought_records_log_frame, orient="vertical", command=self.thought_records_tree.yview)
-        self.thought_records_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.thought_records_tree.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
 
         button_frame = ttk.Frame(self.thought_records_log_frame)
-        button_frame.grid(row=1, column=0, columnspan=2, pady=10)
+        button_frame.grid(row=2, column=0, columnspan=2, pady=10)
         button_frame.grid_columnconfigure(0, weight=1)
         button_frame.grid_columnconfigure(1, weight=1)
         button_frame.grid_columnconfigure(2, weight=1)
@@ -269,38 +435,29 @@ class ProgressPage(ttk.Frame):
         ttk.Button(button_frame, text="Delete Selected", command=self._delete_selected_thought_record).grid(row=0, column=1, padx=10)
         ttk.Button(button_frame, text="Refresh List", command=self._populate_thought_records_treeview).grid(row=0, column=2, padx=10)
 
-        self.thought_records_tree.bind("<Double-1>", lambda event: self._edit_selected_thought_record())
+        self.thought_records_tree.tree.bind("<Double-1>", lambda event: self._edit_selected_thought_record())
 
 
     def _populate_thought_records_treeview(self):
-        for item in self.thought_records_tree.get_children():
-            self.thought_records_tree.delete(item)
-        self.thought_record_data_map.clear()
-
-        # This line correctly calls the updated DataManager method
-        records = self.data_manager.get_all_thought_records() 
-        records.sort(key=lambda x: (x.get("Date", ""), x.get("creation_timestamp", "")))
-
-        for record in records:
-            item_id = record.get("creation_timestamp")
-            if item_id is None:
-                item_id = f"no_timestamp_tr_{id(record)}_{datetime.now().microsecond}"
-                record["creation_timestamp"] = item_id
-
-            display_date = record.get("Date", "N/A")
-            try:
-                display_date = datetime.fromisoformat(display_date).strftime("%Y-%m-%d")
-            except ValueError:
-                pass
-
-            self.thought_records_tree.insert("", "end", iid=item_id, values=(
-                display_date,
-                record.get("Situation", "N/A"),
-                record.get("Main Emotion", "N/A"),
-                record.get("Automatic Thought", "N/A"),
-                record.get("Alternative Thought", "N/A")
-            ))
-            self.thought_record_data_map[item_id] = record
+        self._load_log("Thought Records Log")
+
+    def _thought_record_row_values(self, item_id):
+        return self.thought_record_rows[item_id]
+
+    def _format_thought_record_row(self, record):
+        display_date = record.get("Date", "N/A")
+        try:
+            display_date = datetime.fromisoformat(display_date).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+
+        return (
+            display_date,
+            record.get("Situation", "N/A"),
+            record.get("Main Emotion", "N/A"),
+            record.get("Automatic Thought", "N/A"),
+            record.get("Alternative Thought", "N/A")
+        )
 
     def _edit_selected_thought_record(self):
         selected_items = self.thought_records_tree.selection()
@@ -315,7 +472,7 @@ class ProgressPage(ttk.Frame):
             messagebox.showerror("Error", "Could not retrieve Thought Record data for editing.")
             return
         
-        self.controller.show_frame("ThoughtRecordPage", initial_data=record_data, record_timestamp=record_data.get("creation_timestamp"))
+        self.controller.show_frame("ThoughtRecordPage", initial_data=record_data.copy(), record_timestamp=record_data.get("creation_timestamp"))
 
     def _delete_selected_thought_record(self):
         selected_items = self.thought_records_tree.selection()
@@ -323,37 +480,42 @@ class ProgressPage(ttk.Frame):
             messagebox.showwarning("No Selection", "Please select a Thought Record to delete.")
             return
 
-        confirm = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected Thought Record?")
+        count = len(selected_items)
+        prompt = "Are you sure you want to delete the selected Thought Record?" if count == 1 else f"Are you sure you want to delete the {count} selected Thought Records?"
+        confirm = messagebox.askyesno("Confirm Delete", prompt)
         if confirm:
-            item_id = selected_items[0]
-            record_data = self.thought_record_data_map.get(item_id)
-
-            if record_data is None:
-                messagebox.showerror("Error", "Could not retrieve Thought Record data for deletion.")
-                return
-
-            record_timestamp = record_data.get("creation_timestamp")
-
-            if record_timestamp:
-                success = self.data_manager.delete_thought_record(record_timestamp)
-                if success:
-                    messagebox.showinfo("Deleted", "Thought Record deleted successfully.")
-                    self.thought_record_data_map.pop(item_id, None)
-                    self._populate_thought_records_treeview()
-                else:
-                    messagebox.showerror("Error", "Failed to delete Thought Record. Record not found in data manager.")
+            record_timestamps = []
+            for item_id in selected_items:
+                record_data = self.thought_record_data_map.get(item_id)
+                if record_data is None:
+                    messagebox.showerror("Error", "Could not retrieve Thought Record data for deletion.")
+                    return
+                record_timestamp = record_data.get("creation_timestamp")
+                if not record_timestamp:
+                    messagebox.showerror("Error", "Cannot delete Thought Record: No unique timestamp found for this record.")
+                    return
+                record_timestamps.append(record_timestamp)
+
+            results = self.data_manager.delete_thought_records(record_timestamps)
+            deleted_count = sum(results)
+            if deleted_count == count:
+                messagebox.showinfo("Deleted", "Thought Record deleted successfully." if count == 1 else f"{count} Thought Records deleted successfully.")
+            elif deleted_count:
+                messagebox.showwarning("Partially Deleted", f"{deleted_count} of {count} Thought Records were deleted. The rest were not found in data manager.")
             else:
-                messagebox.showerror("Error", "Cannot delete Thought Record: No unique timestamp found for this record.")
+                messagebox.showerror("Error", "Failed to delete Thought Record. Record not found in data manager.")
+            # The log is updated by the change event (see _on_data_changed)
 
 
     # --- NEW: Problem Solving Tab Setup ---
     def _setup_problem_solving_tab(self):
-        self.problem_solving_log_frame.grid_rowconfigure(0, weight=1) # Treeview
-        self.problem_solving_log_frame.grid_rowconfigure(1, weight=0) # Buttons
+        self.problem_solving_log_frame.grid_rowconfigure(0, weight=0) # Filter bar (see _build_filter_bar)
+        self.problem_solving_log_frame.grid_rowconfigure(1, weight=1) # Treeview
+        self.problem_solving_log_frame.grid_rowconfigure(2, weight=0) # Buttons
         self.problem_solving_log_frame.grid_columnconfigure(0, weight=1)
 
         columns = ("Date", "Problem Description", "Chosen Solution", "Problem Status")
-        self.problem_solving_tree = ttk.Treeview(self.problem_solving_log_frame, columns=columns, show="headings")
+        self.problem_solving_tree = VirtualTreeview(self.problem_solving_log_frame, columns, self._problem_solving_row_values, selectmode="extended")
         
         self.problem_solving_tree.heading("Date", text="Date")
         self.problem_solving_tree.heading("Problem Description", text="Problem")
@@ -365,14 +527,10 @@ class ProgressPage(ttk.Frame):
         self.problem_solving_tree.column("Chosen Solution", width=250, anchor="w")
         self.problem_solving_tree.column("Problem Status", width=120, anchor="center")
 
-        self.problem_solving_tree.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
-
-        scrollbar = ttk.Scrollbar(self.problem_solving_log_frame, orient="vertical", command=self.problem_solving_tree.yview)
-        self.problem_solving_tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.problem_solving_tree.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
 
         button_frame = ttk.Frame(self.problem_solving_log_frame)
-        button_frame.grid(row=1, column=0, columnspan=2, pady=10)
+        button_frame.grid(row=2, column=0, columnspan=2, pady=10)
         button_frame.grid_columnconfigure(0, weight=1)
         button_frame.grid_columnconfigure(1, weight=1)
         button_frame.grid_columnconfigure(2, weight=1)
@@ -381,37 +539,28 @@ class ProgressPage(ttk.Frame):
         ttk.Button(button_frame, text="Delete Selected", command=self._delete_selected_problem_solving_record).grid(row=0, column=1, padx=10)
         ttk.Button(button_frame, text="Refresh List", command=self._populate_problem_solving_treeview).grid(row=0, column=2, padx=10)
 
-        self.problem_solving_tree.bind("<Double-1>", lambda event: self._edit_selected_problem_solving_record())
+        self.problem_solving_tree.tree.bind("<Double-1>", lambda event: self._edit_selected_problem_solving_record())
 
 
     def _populate_problem_solving_treeview(self):
-        for item in self.problem_solving_tree.get_children():
-            self.problem_solving_tree.delete(item)
-        self.problem_solving_data_map.clear()
-
-        # This line correctly calls the updated DataManager method
-        records = self.data_manager.get_all_problem_solving_records() 
-        records.sort(key=lambda x: (x.get("Date", ""), x.get("creation_timestamp", "")))
-
-        for record in records:
-            item_id = record.get("creation_timestamp")
-            if item_id is None:
-                item_id = f"no_timestamp_ps_{id(record)}_{datetime.now().microsecond}"
-                record["creation_timestamp"] = item_id
-
-            display_date = record.get("Date", "N/A")
-            try:
-                display_date = datetime.fromisoformat(display_date).strftime("%Y-%m-%d")
-            except ValueError:
-                pass
-
-            self.problem_solving_tree.insert("", "end", iid=item_id, values=(
-                display_date,
-                record.get("Problem Description", "N/A"),
-                record.get("Chosen Solution", "N/A"),
-                record.get("Problem Status", "N/A")
-            ))
-            self.problem_solving_data_map[item_id] = record
+        self._load_log("Problem Solving Log")
+
+    def _problem_solving_row_values(self, item_id):
+        return self.problem_solving_rows[item_id]
+
+    def _format_problem_solving_row(self, record):
+        display_date = record.get("Date", "N/A")
+        try:
+            display_date = datetime.fromisoformat(display_date).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+
+        return (
+            display_date,
+            record.get("Problem Description", "N/A"),
+            record.get("Chosen Solution", "N/A"),
+            record.get("Problem Status", "N/A")
+        )
 
     def _edit_selected_problem_solving_record(self):
         selected_items = self.problem_solving_tree.selection()
@@ -426,7 +575,7 @@ class ProgressPage(ttk.Frame):
             messagebox.showerror("Error", "Could not retrieve Problem Solving Record data for editing.")
             return
         
-        self.controller.show_frame("ProblemSolvingPage", initial_data=record_data, record_timestamp=record_data.get("creation_timestamp"))
+        self.controller.show_frame("ProblemSolvingPage", initial_data=record_data.copy(), record_timestamp=record_data.get("creation_timestamp"))
 
     def _delete_selected_problem_solving_record(self):
         selected_items = self.problem_solving_tree.selection()
@@ -434,42 +583,449 @@ class ProgressPage(ttk.Frame):
             messagebox.showwarning("No Selection", "Please select a Problem Solving Record to delete.")
             return
 
-        confirm = messagebox.askyesno("Confirm Delete", "Are you sure you want to delete the selected Problem Solving Record?")
+        count = len(selected_items)
+        prompt = "Are you sure you want to delete the selected Problem Solving Record?" if count == 1 else f"Are you sure you want to delete the {count} selected Problem Solving Records?"
+        confirm = messagebox.askyesno("Confirm Delete", prompt)
         if confirm:
-            item_id = selected_items[0]
-            record_data = self.problem_solving_data_map.get(item_id)
-
-            if record_data is None:
-                messagebox.showerror("Error", "Could not retrieve Problem Solving Record data for deletion.")
-                return
-
-            record_timestamp = record_data.get("creation_timestamp")
-
-            if record_timestamp:
-                success = self.data_manager.delete_problem_solving_record(record_timestamp)
-                if success:
-                    messagebox.showinfo("Deleted", "Problem Solving Record deleted successfully.")
-                    self.problem_solving_data_map.pop(item_id, None)
-                    self._populate_problem_solving_treeview()
-                else:
-                    messagebox.showerror("Error", "Failed to delete Problem Solving Record. Record not found in data manager.")
+            record_timestamps = []
+            for item_id in selected_items:
+                record_data = self.problem_solving_data_map.get(item_id)
+                if record_data is None:
+                    messagebox.showerror("Error", "Could not retrieve Problem Solving Record data for deletion.")
+                    return
+                record_timestamp = record_data.get("creation_timestamp")
+                if not record_timestamp:
+                    messagebox.showerror("Error", "Cannot delete Problem Solving Record: No unique timestamp found for this record.")
+                    return
+                record_timestamps.append(record_timestamp)
+
+            results = self.data_manager.delete_problem_solving_records(record_timestamps)
+            deleted_count = sum(results)
+            if deleted_count == count:
+                messagebox.showinfo("Deleted", "Problem Solving Record deleted successfully." if count == 1 else f"{count} Problem Solving Records deleted successfully.")
+            elif deleted_count:
+                messagebox.showwarning("Partially Deleted", f"{deleted_count} of {count} Problem Solving Records were deleted. The rest were not found in data manager.")
             else:
-                messagebox.showerror("Error", "Cannot delete Problem Solving Record: No unique timestamp found for this record.")
+                messagebox.showerror("Error", "Failed to delete Problem Solving Record. Record not found in data manager.")
+            # The log is updated by the change event (see _on_data_changed)
+
+
+    # --- Background loading of the log tabs ---
+    def _load_log(self, tab, reuse_rows=False):
+        """
+        Loads a log tab without blocking the UI: the records are fetched and their rows formatted
+        on the loader thread, and handed back in chunks that _poll_log_load picks up from the Tk loop.
+        Starting a load cancels the one in progress. With reuse_rows (see _resync_log), the rows
+        of records the tab already shows are kept instead of being formatted again, and no
+        progress is shown.
+        """
+        self._cancel_log_load()
+        spec = self._log_tabs[tab]
+        # "version" is the collection's version when the load started (see _on_data_changed);
+        # "known" is a copy of the tab's data map, as the loader thread must not read the live one
+        job = {"tab": tab, "cancel": threading.Event(), "rows": [],
+               "version": self.data_manager.get_collection_version(spec["collection"]),
+               "known": dict(spec["data_map"]) if reuse_rows else None}
+        self._load_job = job
+        self._loader.submit(self._load_log_worker, job, spec["collection"], spec["format_row"], spec["fallback_prefix"])
+        if not reuse_rows:
+            self._show_load_progress(0, 0)
+        self.after(self.LOAD_POLL_MS, self._poll_log_load, job)
+
+    def _refresh_log(self, tab):
+        """Reloads a log tab, unless its collection hasn't changed since the tab was last loaded."""
+        spec = self._log_tabs[tab]
+        version = self.data_manager.get_collection_version(spec["collection"])
+        if version is not None and version == spec["data_version"]:
+            return
+        self._load_log(tab)
+
+    def _load_log_worker(self, job, collection, format_row, fallback_prefix):
+        """Runs on the loader thread. Never touches Tk; only posts (job, kind, payload) messages."""
+        try:
+            # Taken before the query, so a change made while loading is picked up by the next refresh
+            version = self.data_manager.get_collection_version(collection)
+            records = self.data_manager.query(collection) # Sorted by date, then creation_timestamp
+            known = job["known"]
+            total = len(records)
+            for start in range(0, total, self.LOAD_CHUNK_SIZE):
+                if job["cancel"].is_set():
+                    return
+                chunk = []
+                for record in records[start:start + self.LOAD_CHUNK_SIZE]:
+                    item_id = record.get("creation_timestamp")
+                    # A record without a timestamp (older data) gets a row ID of its own. It stays in this
+                    # page's maps: the record is shared with the DataManager's cache and must not change.
+                    # The cached record object lives as long as it is unchanged, so its id() is a stable ID.
+                    if item_id is None:
+                        item_id = f"{fallback_prefix}_{id(record)}"
+                    if known is not None and known.get(item_id) is record:
+                        chunk.append((item_id, record, None)) # Unchanged: the row already shown is reused
+                    else:
+                        chunk.append((item_id, record, format_row(record)))
+                self._load_queue.put((job, "rows", (chunk, start + len(chunk), total)))
+            self._load_queue.put((job, "done", version))
+        except Exception as e:
+            self._load_queue.put((job, "error", e))
+
+    def _poll_log_load(self, job):
+        """Runs on the Tk main loop: collects the loaded chunks and applies them once complete."""
+        if job is not self._load_job:
+            return # Cancelled or superseded
+        try:
+            while True:
+                message_job, kind, payload = self._load_queue.get_nowait()
+                if message_job is not job:
+                    continue # Left over from a cancelled load
+                if kind == "rows":
+                    chunk, loaded, total = payload
+                    job["rows"].extend(chunk)
+                    if job["known"] is None:
+                        self._show_load_progress(loaded, total)
+                elif kind == "done":
+                    self._load_job = None
+                    self.load_status_frame.grid_remove()
+                    rows = job["rows"] if job["known"] is None else self._reuse_rows(job["tab"], job["rows"])
+                    self._sync_log(job["tab"], rows)
+                    self._log_tabs[job["tab"]]["data_version"] = payload
+                    return
+                else:
+                    self._load_job = None
+                    self.load_status_frame.grid_remove()
+                    messagebox.showerror("Error", f"Could not load {job['tab']}: {payload}")
+                    return
+        except queue.Empty:
+            pass
+        self.after(self.LOAD_POLL_MS, self._poll_log_load, job)
+
+    def _cancel_log_load(self):
+        """Stops the load in progress (e.g. when the user switches tabs); the tab keeps its current rows."""
+        if self._load_job is not None:
+            self._load_job["cancel"].set()
+            self._load_job = None
+        self.load_status_frame.grid_remove()
+
+    def _show_load_progress(self, loaded, total):
+        self.load_status_label.config(text=f"Loading... {loaded} of {total}" if total else "Loading...")
+        self.load_progressbar.config(maximum=max(total, 1), value=loaded)
+        self.load_status_frame.grid()
+
+    # --- Keyed log models shared by the three log tabs ---
+    def _sync_log(self, tab, rows):
+        """
+        Brings a log tab's data map and view in line with freshly loaded (row ID, record, values)
+        rows, keyed by creation_timestamp. Records the DataManager replaced (added or updated) are
+        detected by identity, so only those rows and rows that moved are redrawn.
+        """
+        spec = self._log_tabs[tab]
+        data_map = spec["data_map"]
+        new_map = {}
+        changed = []
+        for item_id, record, values in rows:
+            if data_map.get(item_id) is not record:
+                changed.append(item_id)
+            new_map[item_id] = record
+        if changed or len(new_map) != len(data_map):
+            spec["version"] += 1
+        data_map.clear()
+        data_map.update(new_map)
+        spec["rows"].clear()
+        spec["rows"].update((item_id, values) for item_id, _, values in rows)
+        spec["tree"].set_rows(self._display_row_ids(tab), changed=changed)
+        if spec["filter_matches"] is not None:
+            self._apply_filter(tab) # New or changed rows have to be matched again
+
+    def _remove_log_rows(self, tab, record_timestamps):
+        """
+        Drops deleted records from a log tab without re-querying or redrawing the other rows.
+        Records the DataManager could not find are already gone, so they are dropped as well.
+        """
+        spec = self._log_tabs[tab]
+        for record_timestamp in record_timestamps:
+            spec["data_map"].pop(record_timestamp, None)
+            spec["rows"].pop(record_timestamp, None)
+        spec["version"] += 1
+        spec["tree"].delete_rows(record_timestamps)
+        if self._load_job is not None and self._load_job["tab"] == tab:
+            self._load_log(tab) # The running load may have fetched the records before they were deleted
+
+    # --- Change events pushed by the DataManager ---
+    def _on_data_changed(self, events):
+        """
+        Applies a batch of ChangeEvents (delivered once per idle cycle by CBTApp.change_events) to
+        the log tabs that were already loaded, and redraws the trends chart if it is on screen.
+        Tabs that can't be updated in place are reloaded now if on screen, otherwise when next shown.
+        """
+        by_collection = {}
+        for event in events:
+            by_collection.setdefault(event.collection, []).append(event)
+        on_screen = self.controller.current_page == "ProgressPage"
+        selected_tab = self.notebook.tab(self.notebook.select(), "text")
+        for tab, spec in self._log_tabs.items():
+            tab_events = by_collection.get(spec["collection"])
+            if not tab_events or spec["data_version"] is None:
+                continue # Never loaded (or already due for a reload)
+            job = self._load_job
+            if job is not None and job["tab"] == tab:
+                if job["version"] is None or tab_events[-1].version > job["version"]:
+                    self._load_log(tab) # The running load may have read the records before these changes
+                continue
+            if not self._apply_change_events(tab, tab_events):
+                spec["data_version"] = None
+                if on_screen and tab == selected_tab:
+                    self._load_log(tab)
+        if on_screen and selected_tab == "Activity Trends" and "behavioral_activation_activities" in by_collection:
+            self.plot_ba_trends() # The ratings columns are already up to date
+        if on_screen:
+            self._refresh_summary()
+
+    # --- Summary line ---
+    def _refresh_summary(self):
+        """Updates the summary line; the first time, the collections are loaded off the Tk thread."""
+        self.controller.request_statistics(self._show_summary)
+
+    def _show_summary(self, statistics):
+        """Writes the all-time summary line from the running statistics."""
+        activities = statistics["behavioral_activation_activities"]
+        thought_records = statistics["thought_records"]
+        problems = statistics["problem_solving_records"]
+        parts = [f"Activities: {activities.count}"]
+        gaps = [f"{gap} {activities.mean_gap(gap):+.1f}" for gap in ("pleasure", "mastery") if activities.mean_gap(gap) is not None]
+        if gaps:
+            parts[-1] += f" (actual vs. predicted: {', '.join(gaps)})"
+        parts.append(f"Thought records: {thought_records.count}")
+        drops = list(thought_records.mean_drops().items())[:3]
+        if drops:
+            parts[-1] += f" (average drop: {', '.join(f'{emotion} {drop:.0f}' for emotion, drop in drops)})"
+        parts.append(f"Problems: {problems.open} open, {problems.in_progress} in progress, {problems.resolved} solved")
+        self.summary_label.config(text="   |   ".join(parts))
+
+    def _apply_change_events(self, tab, events):
+        """Updates a loaded log tab for the change events of its collection. Returns False if it needs a reload."""
+        spec = self._log_tabs[tab]
+        kinds = {event.kind for event in events}
+        if kinds & {BULK_CHANGED, EXTERNALLY_RELOADED}:
+            return False
+        if kinds == {DELETED}:
+            loaded_version = spec["data_version"]
+            self._remove_log_rows(tab, [record_timestamp for event in events for record_timestamp in event.timestamps])
+            # Still up to date if these deletions are the only changes since the tab was loaded
+            if [event.version for event in events] == list(range(loaded_version + 1, loaded_version + 1 + len(events))):
+                spec["data_version"] = events[-1].version
+            return True
+        self._resync_log(tab)
+        return True
+
+    def _resync_log(self, tab):
+        """
+        Brings a loaded log tab up to date after records were added or updated. The records are
+        queried on the loader thread like a full load, but the DataManager's cached records are
+        reused, so only the rows of records it replaced are formatted again.
+        """
+        self._load_log(tab, reuse_rows=True)
+
+    def _reuse_rows(self, tab, rows):
+        """Fills in the values of the rows a resync left unformatted from the rows the tab shows."""
+        spec = self._log_tabs[tab]
+        data_map, shown = spec["data_map"], spec["rows"]
+        return [(item_id, record, values if values is not None
+                 else shown[item_id] if data_map.get(item_id) is record else spec["format_row"](record))
+                for item_id, record, values in rows]
+
+    # --- Click-to-sort column headings ---
+    def _sort_log(self, tab, column):
+        """Sorts a log tab by a column; clicking the same heading again toggles the direction."""
+        spec = self._log_tabs[tab]
+        descending = spec["sort"] == (column, False)
+        spec["sort"] = (column, descending)
+        for heading, text in spec["headings"].items():
+            arrow = (" \u25bc" if descending else " \u25b2") if heading == column else ""
+            spec["tree"].heading(heading, text=text + arrow)
+        # Only the order changes, so the view just rewrites the slots on screen
+        spec["tree"].set_rows(self._display_row_ids(tab), changed=())
+
+    def _sorted_row_ids(self, tab):
+        """
+        Returns a log tab's row IDs in display order: by date unless a heading was clicked.
+        Each column's order is sorted once per data version and cached as a permutation of
+        row IDs, so repeated clicks and direction toggles don't sort again.
+        """
+        spec = self._log_tabs[tab]
+        if spec["sort"] is None:
+            return list(spec["data_map"])
+        column, descending = spec["sort"]
+        cache = spec["sort_cache"]
+        if cache.get("version") != spec["version"]:
+            cache.clear()
+            cache["version"] = spec["version"]
+        order = cache.get(column)
+        if order is None:
+            position = spec["tree"].tree["columns"].index(column)
+            rows = spec["rows"]
+            # Python's sort is stable, so equal values keep their date order
+            order = cache[column] = sorted(spec["data_map"], key=lambda item_id: self._sort_key(rows[item_id][position]))
+        return order[::-1] if descending else order
+
+    def _sort_key(self, value):
+        """Sorts numbers numerically, then text case-insensitively, then empty/'N/A' values last."""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (0, value, "")
+        text = str(value).strip()
+        if text in ("", "N/A"):
+            return (2, 0, "")
+        try:
+            return (0, float(text), "")
+        except ValueError:
+            return (1, 0, text.casefold())
+
+    # --- Filter bar ---
+    def _build_filter_bar(self, tab, spec):
+        """Adds the search box, optional status picker and date range above a log tab's Treeview."""
+        spec["filter_matches"] = None # Set of matching row IDs while a filter is active
+        spec["filter_generation"] = 0 # Bumped by every change, so a running (stale) match stops
+        spec["filter_after"] = None # Pending debounce callback
+        spec["search_cache"] = {} # Normalized search fields, for spec["search_cache"]["version"]
+
+        bar = ttk.Frame(spec["tree"].master)
+        bar.grid(row=0, column=0, columnspan=2, sticky="ew", padx=5, pady=(5, 0))
+        bar.grid_columnconfigure(1, weight=1)
+        schedule = lambda *args: self._schedule_filter(tab)
+
+        ttk.Label(bar, text="Search:").grid(row=0, column=0, padx=(0, 5))
+        spec["search_var"] = tk.StringVar()
+        spec["search_var"].trace_add("write", schedule)
+        ttk.Entry(bar, textvariable=spec["search_var"]).grid(row=0, column=1, sticky="ew")
+
+        column = 2
+        if spec["status_field"]:
+            ttk.Label(bar, text="Status:").grid(row=0, column=column, padx=(10, 5))
+            spec["status_var"] = tk.StringVar(value="All")
+            status_box = ttk.Combobox(bar, textvariable=spec["status_var"], state="readonly", width=16,
+                                      values=("All",) + spec["status_values"])
+            status_box.grid(row=0, column=column + 1)
+            status_box.bind("<<ComboboxSelected>>", schedule)
+            column += 2
+
+        spec["date_range_var"] = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bar, text="From", variable=spec["date_range_var"], command=schedule).grid(row=0, column=column, padx=(10, 5))
+        spec["start_date_entry"] = DateEntry(bar, width=12, background='darkblue', foreground='white', borderwidth=2, date_pattern='yyyy-mm-dd')
+        spec["start_date_entry"].grid(row=0, column=column + 1)
+        ttk.Label(bar, text="to").grid(row=0, column=column + 2, padx=5)
+        spec["end_date_entry"] = DateEntry(bar, width=12, background='darkblue', foreground='white', borderwidth=2, date_pattern='yyyy-mm-dd')
+        spec["end_date_entry"].grid(row=0, column=column + 3)
+        for date_entry in (spec["start_date_entry"], spec["end_date_entry"]):
+            date_entry.bind("<<DateEntrySelected>>", schedule)
+
+        ttk.Button(bar, text="Clear", command=lambda: self._clear_filter(tab)).grid(row=0, column=column + 4, padx=(10, 0))
+        spec["filter_count_label"] = ttk.Label(bar, text="")
+        spec["filter_count_label"].grid(row=0, column=column + 5, padx=(10, 0))
+
+    def _clear_filter(self, tab):
+        spec = self._log_tabs[tab]
+        spec["search_var"].set("")
+        if spec["status_field"]:
+            spec["status_var"].set("All")
+        spec["date_range_var"].set(False)
+        self._schedule_filter(tab)
+
+    def _filter_criteria(self, tab):
+        """Returns (search terms, status, start date, end date) from the filter bar, or None if it is empty."""
+        spec = self._log_tabs[tab]
+        terms = normalize(spec["search_var"].get()).split()
+        status = spec["status_var"].get() if spec["status_field"] else "All"
+        status = None if status == "All" else status
+        start_date = end_date = None
+        if spec["date_range_var"].get():
+            start_date = spec["start_date_entry"].get_date().isoformat()
+            end_date = spec["end_date_entry"].get_date().isoformat()
+        if not terms and status is None and start_date is None:
+            return None
+        return terms, status, start_date, end_date
+
+    def _search_entries(self, tab):
+        """
+        Returns the normalized search text, date and status of every row, built once per data
+        version so each keystroke only scans prepared strings.
+        """
+        spec = self._log_tabs[tab]
+        cache = spec["search_cache"]
+        if cache.get("version") != spec["version"]:
+            entries = []
+            for item_id, record in spec["data_map"].items():
+                text = normalize("\n".join(str(record.get(field, "")) for field in spec["search_fields"]))
+                record_date = str(record.get(spec["date_field"], ""))[:10]
+                status = record.get(spec["status_field"]) if spec["status_field"] else None
+                entries.append((item_id, text, record_date, status))
+            cache.clear()
+            cache.update(version=spec["version"], entries=entries)
+        return cache["entries"]
+
+    def _schedule_filter(self, tab):
+        """Debounces filter changes: the filter runs once the user stops typing for FILTER_DEBOUNCE_MS."""
+        spec = self._log_tabs[tab]
+        spec["filter_generation"] += 1 # Cancels a match that is still running for an older query
+        if spec["filter_after"] is not None:
+            self.after_cancel(spec["filter_after"])
+        spec["filter_after"] = self.after(self.FILTER_DEBOUNCE_MS, self._apply_filter, tab)
+
+    def _apply_filter(self, tab):
+        spec = self._log_tabs[tab]
+        spec["filter_after"] = None
+        spec["filter_generation"] += 1
+        criteria = self._filter_criteria(tab)
+        if criteria is None:
+            spec["filter_matches"] = None
+            self._show_filtered_rows(tab)
+            return
+        self._filter_step(tab, spec["filter_generation"], criteria, self._search_entries(tab), 0, set())
 
+    def _filter_step(self, tab, generation, criteria, entries, start, matches):
+        """Matches one chunk of rows, then yields to the Tk loop; stops if a newer query was started."""
+        spec = self._log_tabs[tab]
+        if generation != spec["filter_generation"]:
+            return
+        terms, status, start_date, end_date = criteria
+        for item_id, text, record_date, record_status in entries[start:start + self.FILTER_CHUNK_SIZE]:
+            if status is not None and record_status != status:
+                continue
+            if start_date is not None and not (start_date <= record_date <= end_date):
+                continue
+            if all(term in text for term in terms):
+                matches.add(item_id)
+        start += self.FILTER_CHUNK_SIZE
+        if start < len(entries):
+            self.after(1, self._filter_step, tab, generation, criteria, entries, start, matches)
+            return
+        spec["filter_matches"] = matches
+        self._show_filtered_rows(tab)
+
+    def _show_filtered_rows(self, tab):
+        spec = self._log_tabs[tab]
+        row_ids = self._display_row_ids(tab)
+        spec["tree"].set_rows(row_ids, changed=())
+        total = len(spec["data_map"])
+        spec["filter_count_label"].config(text="" if spec["filter_matches"] is None else f"{len(row_ids)} of {total}")
+
+    def _display_row_ids(self, tab):
+        """Returns the row IDs to show: in sort order, narrowed to the filter matches if a filter is active."""
+        row_ids = self._sorted_row_ids(tab)
+        matches = self._log_tabs[tab]["filter_matches"]
+        if matches is None:
+            return row_ids
+        return [item_id for item_id in row_ids if item_id in matches]
 
     def refresh_page(self):
         """Method called by app.py when this page is brought to front."""
         # This will ensure the correct tab is refreshed
         selected_tab = self.notebook.tab(self.notebook.select(), "text")
+        self._cancel_log_load() # A load still running for the previous tab is no longer needed
+        self._refresh_summary()
         
-        if selected_tab == "Activity Log":
-            self.populate_ba_treeview()
+        # Log tabs are only reloaded if their collection changed since they were last loaded
+        if selected_tab in self._log_tabs:
+            self._refresh_log(selected_tab)
         elif selected_tab == "Activity Trends":
-            self.plot_ba_trends()
-        elif selected_tab == "Thought Records Log":
-            self._populate_thought_records_treeview()
-        elif selected_tab == "Problem Solving Log":
-            self._populate_problem_solving_treeview()
+            self.plot_ba_trends() # Skips redrawing by itself when the ratings didn't change
 
     def _on_tab_change(self, event):
         # Refresh content based on selected tab
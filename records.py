@@ -0,0 +1,195 @@
+# records.py
+
+import sys
+from collections.abc import MutableMapping
+
+class _Missing:
+    """Type of the _MISSING marker. Pickles by reference, so unpickled records still use the same marker."""
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_MISSING"
+
+    def __repr__(self):
+        return "<missing>"
+
+_MISSING = _Missing() # Marks a known field that the record does not have
+
+class Record(MutableMapping):
+    """
+    Base class for the typed record objects returned by DataManager.
+
+    Each known field is stored in a __slots__ attribute instead of a per-record dict, so a
+    record costs a fixed handful of pointers, and repeated strings (emotion names, activity
+    names, statuses, ...) are interned so every record shares one copy.
+    Records still behave like the dicts they replace (record["Date"], .get(), .items(), ...),
+    and to_dict()/from_dict() round-trip every field, including ones this class doesn't know.
+
+    DataManager freezes the records it caches and hands out from lists and queries, so they
+    can't be changed behind its back; copy() returns an editable record.
+    """
+    __slots__ = ("_extra", "_frozen")
+
+    # (JSON key, attribute name) for each known field, in the order they are written out
+    FIELDS = ()
+    # JSON keys whose string values are interned
+    INTERNED = ()
+    # JSON keys holding {name: value} dicts whose names are interned (e.g. emotions)
+    INTERNED_KEYS = ()
+
+    _attributes = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._attributes = dict(cls.FIELDS)
+
+    def __init__(self, data=None, **fields):
+        for _, attribute in self.FIELDS:
+            object.__setattr__(self, attribute, _MISSING)
+        self._extra = None # Unknown fields, only allocated when a record has any
+        self._frozen = False
+        if data is not None:
+            self.update(data)
+        if fields:
+            self.update(fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a record from a dict (e.g. parsed JSON). Returns a copy if `data` already is one."""
+        return cls(data)
+
+    def to_dict(self):
+        """Returns the record as a plain dict, ready for json.dump."""
+        return dict(self.items())
+
+    def copy(self):
+        """Returns a shallow, editable copy of the record."""
+        return type(self)(self)
+
+    def freeze(self):
+        """Makes the record read-only: setting or deleting a field raises TypeError from now on."""
+        self._frozen = True
+        return self
+
+    def _check_writable(self):
+        if self._frozen:
+            raise TypeError(f"This {type(self).__name__} is shared and read-only; edit a copy() of it instead.")
+
+    def _intern(self, key, value):
+        """Interns the repeated strings of a field value."""
+        if key in self.INTERNED and type(value) is str:
+            return sys.intern(value)
+        if key in self.INTERNED_KEYS and isinstance(value, dict):
+            return {sys.intern(name) if type(name) is str else name: item for name, item in value.items()}
+        return value
+
+    def __getitem__(self, key):
+        attribute = self._attributes.get(key)
+        if attribute is not None:
+            value = getattr(self, attribute)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self._check_writable()
+        value = self._intern(key, value)
+        attribute = self._attributes.get(key)
+        if attribute is not None:
+            setattr(self, attribute, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[sys.intern(key) if type(key) is str else key] = value
+
+    def __delitem__(self, key):
+        self._check_writable()
+        attribute = self._attributes.get(key)
+        if attribute is not None:
+            if getattr(self, attribute) is _MISSING:
+                raise KeyError(key)
+            setattr(self, attribute, _MISSING)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        attribute = self._attributes.get(key)
+        if attribute is not None:
+            return getattr(self, attribute) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for key, attribute in self.FIELDS:
+            if getattr(self, attribute) is not _MISSING:
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ThoughtRecord(Record):
+    """A thought record (see ThoughtRecordPage)."""
+    FIELDS = (
+        ("Date", "date"),
+        ("Situation", "situation"),
+        ("Initial Emotions", "initial_emotions"),
+        ("Automatic Thoughts", "automatic_thoughts"),
+        ("Belief in Automatic Thoughts", "belief_in_automatic_thoughts"),
+        ("Evidence For", "evidence_for"),
+        ("Evidence Against", "evidence_against"),
+        ("Alternative Thought", "alternative_thought"),
+        ("Belief in Alternative Thought", "belief_in_alternative_thought"),
+        ("Final Emotions", "final_emotions"),
+        ("creation_timestamp", "creation_timestamp"),
+    )
+    INTERNED = ("Date",)
+    INTERNED_KEYS = ("Initial Emotions", "Final Emotions")
+    __slots__ = tuple(attribute for _, attribute in FIELDS)
+
+
+class BehavioralActivationActivity(Record):
+    """A behavioral activation activity (see BehavioralActivationPage)."""
+    FIELDS = (
+        ("Activity Date", "activity_date"),
+        ("Activity Name", "activity_name"),
+        ("Predicted Pleasure", "predicted_pleasure"),
+        ("Predicted Mastery", "predicted_mastery"),
+        ("Actual Pleasure", "actual_pleasure"),
+        ("Actual Mastery", "actual_mastery"),
+        ("Notes", "notes"),
+        ("creation_timestamp", "creation_timestamp"),
+    )
+    INTERNED = ("Activity Date", "Activity Name")
+    __slots__ = tuple(attribute for _, attribute in FIELDS)
+
+
+class ProblemSolvingRecord(Record):
+    """A problem solving record (see ProblemSolvingPage)."""
+    FIELDS = (
+        ("Date", "date"),
+        ("Problem Description", "problem_description"),
+        ("Brainstormed Solutions", "brainstormed_solutions"),
+        ("Chosen Solution", "chosen_solution"),
+        ("Action Plan", "action_plan"),
+        ("Outcome/Review", "outcome_review"),
+        ("Problem Status", "problem_status"),
+        ("creation_timestamp", "creation_timestamp"),
+    )
+    INTERNED = ("Date", "Problem Status")
+    __slots__ = tuple(attribute for _, attribute in FIELDS)
+
+
+def json_default(obj):
+    """`default` hook for json.dump/json.dumps, so records serialize as plain JSON objects."""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
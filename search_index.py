@@ -0,0 +1,186 @@
+# search_index.py
+
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+
+_WORD = re.compile(r"\w+")
+_QUERY_WORD = re.compile(r"(\w+)(\*?)")
+
+def normalize(text):
+    """Lower-cases text and strips accents, so 'Café' matches 'cafe'."""
+    text = unicodedata.normalize("NFKD", str(text).casefold())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+def tokenize(text):
+    """Splits text into normalized word tokens."""
+    return _WORD.findall(normalize(text))
+
+def parse_query(text):
+    """
+    Splits a query into (term, is_prefix) pairs. A term ending in '*' is a prefix, and so is the
+    last term while it is still being typed (no trailing space), so results follow the user's typing.
+    """
+    text = normalize(text)
+    matches = list(_QUERY_WORD.finditer(text))
+    terms = []
+    for position, match in enumerate(matches):
+        is_last = position == len(matches) - 1
+        terms.append((match.group(1), bool(match.group(2)) or (is_last and match.end() == len(text))))
+    return terms
+
+
+class SearchIndex:
+    """
+    An inverted index over the free-text fields of every collection, ranked with BM25.
+
+    Postings map each term to the documents containing it ({(collection, key): term count}).
+    The term counts of each document are kept as well, so a record can be re-indexed or removed
+    without knowing its old text. All query terms must match (AND); prefix terms match every
+    term starting with them, found by binary search in the sorted vocabulary.
+    """
+    FORMAT_VERSION = 1
+    K1 = 1.2 # BM25 term frequency saturation
+    B = 0.75 # BM25 document length normalization
+
+    def __init__(self, fields):
+        """`fields` maps each collection name to the record fields that are indexed."""
+        self.fields = {collection: tuple(names) for collection, names in fields.items()}
+        self.signatures = {} # collection -> signature of the data the documents were built from (None once changed)
+        self._documents = {collection: {} for collection in self.fields} # collection -> {key: Counter of terms}
+        self._postings = {} # term -> {(collection, key): count}
+        self._lengths = {} # (collection, key) -> number of tokens
+        self._total_length = 0
+        self._vocabulary = None # Sorted terms for prefix lookups, rebuilt after new terms were added
+
+    # --- Maintenance ---
+    def _document_terms(self, collection, record):
+        terms = Counter()
+        for field in self.fields[collection]:
+            value = record.get(field)
+            if value:
+                terms.update(tokenize(value))
+        return terms
+
+    def _insert(self, collection, key, terms):
+        self._documents[collection][key] = terms
+        document = (collection, key)
+        for term, count in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._vocabulary = None
+            postings[document] = count
+        length = sum(terms.values())
+        self._lengths[document] = length
+        self._total_length += length
+
+    def add(self, collection, key, record):
+        """Indexes a record, replacing what was indexed under its key before."""
+        self.remove(collection, key)
+        self._insert(collection, key, self._document_terms(collection, record))
+        self.signatures[collection] = None
+
+    def remove(self, collection, key):
+        """Drops a record from the index (a no-op if it isn't indexed)."""
+        terms = self._documents[collection].pop(key, None)
+        if terms is None:
+            return
+        document = (collection, key)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[document]
+            if not postings:
+                del self._postings[term] # Stays in a stale _vocabulary until it is rebuilt; lookups skip it
+        self._total_length -= self._lengths.pop(document)
+        self.signatures[collection] = None
+
+    def rebuild(self, collection, items, signature=None):
+        """Re-indexes a whole collection from (key, record) pairs."""
+        for key in list(self._documents[collection]):
+            self.remove(collection, key)
+        for key, record in items:
+            self._insert(collection, key, self._document_terms(collection, record))
+        self.signatures[collection] = signature
+
+    def keys(self, collection):
+        """Returns the keys of the records indexed for a collection."""
+        return self._documents[collection].keys()
+
+    # --- Queries ---
+    def _expand(self, term, is_prefix):
+        """Returns the indexed terms a query term matches."""
+        if not is_prefix:
+            return [term] if term in self._postings else []
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        matches = []
+        position = bisect_left(vocabulary, term)
+        while position < len(vocabulary) and vocabulary[position].startswith(term):
+            if vocabulary[position] in self._postings:
+                matches.append(vocabulary[position])
+            position += 1
+        return matches
+
+    def search(self, query, limit=None, collections=None):
+        """
+        Returns (score, collection, key) for the records matching every term of `query`,
+        best first. `collections` restricts the search to some collections.
+        """
+        terms = parse_query(query)
+        if not terms or not self._lengths:
+            return []
+        count = len(self._lengths)
+        average_length = self._total_length / count or 1
+        scores = None
+        for term, is_prefix in terms:
+            term_scores = {}
+            for indexed_term in self._expand(term, is_prefix):
+                postings = self._postings[indexed_term]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for document, frequency in postings.items():
+                    if scores is not None and document not in scores:
+                        continue # Already ruled out by an earlier term
+                    norm = self.K1 * (1 - self.B + self.B * self._lengths[document] / average_length)
+                    score = idf * frequency * (self.K1 + 1) / (frequency + norm)
+                    # A prefix matching several words of a document counts once, for its best word
+                    if score > term_scores.get(document, 0.0):
+                        term_scores[document] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {document: scores[document] + score for document, score in term_scores.items()}
+            if not scores:
+                return []
+        hits = [(score, collection, key) for (collection, key), score in scores.items()
+                if collections is None or collection in collections]
+        hits.sort(key=lambda hit: (-hit[0], hit[1], hit[2]))
+        return hits[:limit] if limit is not None else hits
+
+    # --- Persistence ---
+    def to_dict(self):
+        """Returns the index as JSON-ready data: each collection's signature and per-record term counts."""
+        return {
+            "format": self.FORMAT_VERSION,
+            "collections": {
+                collection: {"signature": self.signatures.get(collection), "documents": documents}
+                for collection, documents in self._documents.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, fields, data):
+        """Rebuilds an index saved with to_dict(). Collections saved in another format are left empty."""
+        index = cls(fields)
+        if not isinstance(data, dict) or data.get("format") != cls.FORMAT_VERSION:
+            return index
+        for collection, saved in data.get("collections", {}).items():
+            if collection not in index.fields or not isinstance(saved, dict):
+                continue
+            for key, terms in saved.get("documents", {}).items():
+                index._insert(collection, key, Counter(terms))
+            index.signatures[collection] = saved.get("signature")
+        return index
@@ -0,0 +1,153 @@
+# search_page.py
+
+import tkinter as tk
+from tkinter import ttk
+
+from search_index import normalize, parse_query
+from virtual_treeview import VirtualTreeview
+
+class SearchPage(ttk.Frame):
+    """Full-text search across thought records, activities and problem solving records (see DataManager.search)."""
+    SEARCH_DEBOUNCE_MS = 250
+    RESULT_LIMIT = 500
+    SNIPPET_LENGTH = 90
+    # collection -> (label shown in the Type column, page that edits it, date field)
+    RECORD_TYPES = {
+        "thought_records": ("Thought Record", "ThoughtRecordPage", "Date"),
+        "behavioral_activation_activities": ("Activity", "BehavioralActivationPage", "Activity Date"),
+        "problem_solving_records": ("Problem Solving", "ProblemSolvingPage", "Date"),
+    }
+
+    def __init__(self, parent, controller, data_manager):
+        super().__init__(parent)
+        self.controller = controller
+        self.data_manager = data_manager
+        self._results = {} # Row ID -> (collection, record)
+        self._rows = {} # Row ID -> display values
+        self._search_after = None
+        self._search_generation = 0 # Bumped by every search, so results of an older one are dropped
+
+        self.grid_rowconfigure(0, weight=0) # Title
+        self.grid_rowconfigure(1, weight=0) # Search bar
+        self.grid_rowconfigure(2, weight=1) # Results
+        self.grid_columnconfigure(0, weight=1)
+
+        ttk.Label(self, text="Search Your Entries", font=("Helvetica", 16, "bold")).grid(row=0, column=0, pady=10, sticky="ew")
+
+        search_bar = ttk.Frame(self)
+        search_bar.grid(row=1, column=0, sticky="ew", padx=10)
+        search_bar.grid_columnconfigure(1, weight=1)
+        ttk.Label(search_bar, text="Search:").grid(row=0, column=0, padx=(0, 5))
+        self.query_var = tk.StringVar()
+        self.query_entry = ttk.Entry(search_bar, textvariable=self.query_var)
+        self.query_entry.grid(row=0, column=1, sticky="ew")
+        self.query_var.trace_add("write", lambda *args: self._schedule_search())
+        self.result_count_label = ttk.Label(search_bar, text="")
+        self.result_count_label.grid(row=0, column=2, padx=(10, 0))
+        ttk.Label(search_bar, text="All words must match; end a word with * to match its beginning. Double-click an entry to open it.",
+                  foreground="gray").grid(row=1, column=0, columnspan=3, sticky="w", pady=(2, 0))
+
+        columns = ("Type", "Date", "Match")
+        self.results_tree = VirtualTreeview(self, columns, self._result_row_values, selectmode="browse")
+        self.results_tree.grid(row=2, column=0, sticky="nsew", padx=10, pady=10)
+        for column, width, stretch in (("Type", 120, False), ("Date", 100, False), ("Match", 600, True)):
+            self.results_tree.heading(column, text=column)
+            self.results_tree.column(column, width=width, anchor="w", stretch=stretch)
+        self.results_tree.tree.bind("<Double-1>", lambda event: self._open_selected_result())
+        self.results_tree.tree.bind("<Return>", lambda event: self._open_selected_result())
+
+        # Results follow changes saved on other pages while the search is on screen
+        self.controller.change_events.subscribe(self._on_data_changed)
+
+    def load_data(self, query=""):
+        """Called by app.py with the text typed in the sidebar search box."""
+        self.query_var.set(query) # Schedules the search
+        self._run_search()
+        self.query_entry.focus_set()
+        self.query_entry.icursor(tk.END)
+
+    def refresh_page(self):
+        """Called by app.py when navigating here without a query."""
+        self._run_search()
+
+    def _on_data_changed(self, events):
+        if self.controller.current_page == "SearchPage" and self.query_var.get().strip():
+            self._run_search()
+
+    def _schedule_search(self):
+        """Debounces typing: the search runs once the user stops typing for SEARCH_DEBOUNCE_MS."""
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(self.SEARCH_DEBOUNCE_MS, self._run_search)
+
+    def _run_search(self):
+        """
+        Starts the search on a worker thread: the first search may have to load collections and
+        their search index. The results are shown by _show_results, unless a newer search started.
+        """
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+            self._search_after = None
+        self._search_generation += 1
+        generation = self._search_generation
+        query = self.query_var.get()
+        if not query.strip():
+            self._show_results(generation, query, [])
+            return
+        self.result_count_label.config(text="Searching...")
+        self.controller.run_in_background(
+            self.data_manager.search, lambda hits: self._show_results(generation, query, hits), query, self.RESULT_LIMIT,
+            error_callback=lambda error: self._show_search_error(generation))
+
+    def _show_search_error(self, generation):
+        if generation == self._search_generation:
+            self.result_count_label.config(text="Search failed")
+
+    def _show_results(self, generation, query, hits):
+        if generation != self._search_generation:
+            return # A newer search is running or done
+        terms = parse_query(query)
+        self._results.clear()
+        self._rows.clear()
+        for collection, key, record in hits:
+            row_id = f"{collection}:{key}" # Search keys are unique within a collection, unlike a missing timestamp
+            label, _, date_field = self.RECORD_TYPES[collection]
+            self._results[row_id] = (collection, record)
+            self._rows[row_id] = (label, str(record.get(date_field, "N/A"))[:10], self._snippet(collection, record, terms))
+        self.results_tree.set_rows(list(self._results))
+        if not query.strip():
+            self.result_count_label.config(text="")
+        elif len(hits) >= self.RESULT_LIMIT:
+            self.result_count_label.config(text=f"Top {len(hits)} matches")
+        else:
+            self.result_count_label.config(text=f"{len(hits)} match" + ("" if len(hits) == 1 else "es"))
+
+    def _snippet(self, collection, record, terms):
+        """Returns the text around the first query word found in a record's searchable fields."""
+        for field in self.data_manager.SEARCH_FIELDS[collection]:
+            text = " ".join(str(record.get(field) or "").split())
+            if not text:
+                continue
+            folded = normalize(text)
+            positions = [folded.find(term) for term, _ in terms if term in folded]
+            if positions and len(folded) == len(text): # Accents stripped without changing the length
+                start = max(0, min(positions) - self.SNIPPET_LENGTH // 3)
+            elif positions:
+                start = 0
+            else:
+                continue
+            snippet = text[start:start + self.SNIPPET_LENGTH]
+            return f"{field}: " + ("..." if start else "") + snippet + ("..." if start + self.SNIPPET_LENGTH < len(text) else "")
+        return ""
+
+    def _result_row_values(self, row_id):
+        return self._rows[row_id]
+
+    def _open_selected_result(self):
+        selected = self.results_tree.selection()
+        if not selected:
+            return "break"
+        collection, record = self._results[selected[0]]
+        _, page_name, _ = self.RECORD_TYPES[collection]
+        self.controller.show_frame(page_name, initial_data=record.copy(), record_timestamp=record.get("creation_timestamp"))
+        return "break"
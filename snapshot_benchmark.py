@@ -0,0 +1,71 @@
+# snapshot_benchmark.py
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+from data_manager import DataManager
+from startup_benchmark import time_import
+
+SIZES = (10_000, 100_000)
+
+EMOTIONS = ("Anxious", "Sad", "Angry", "Ashamed", "Guilty", "Frustrated")
+WORDS = ("work", "meeting", "friend", "email", "deadline", "family", "phone", "call", "late", "tired",
+         "worried", "forgot", "criticized", "ignored", "mistake", "project", "presentation", "dinner")
+
+def sentence(rng, length):
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+def make_thought_records(count, seed=0):
+    """Returns `count` synthetic thought records shaped like the ones ThoughtRecordPage saves."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        day = f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        initial = {emotion: rng.randint(20, 100) for emotion in rng.sample(EMOTIONS, 2)}
+        records.append({
+            "Date": day,
+            "Situation": sentence(rng, 12),
+            "Initial Emotions": initial,
+            "Automatic Thoughts": sentence(rng, 20),
+            "Evidence For": sentence(rng, 15),
+            "Evidence Against": sentence(rng, 15),
+            "Alternative Thought": sentence(rng, 15),
+            "Final Emotions": {emotion: max(0, value - rng.randint(0, 50)) for emotion, value in initial.items()},
+            "creation_timestamp": f"{day}T12:00:00.{i:06d}",
+        })
+    return records
+
+def time_first_load(base_dir, snapshots, runs=5):
+    """Returns the median time of DataManager's first read of the thought records, in a fresh interpreter per run."""
+    setup = f"from data_manager import DataManager; dm = DataManager({base_dir!r}, snapshots={snapshots})"
+    return time_import("dm.get_all_thought_records()", runs, setup=setup)
+
+def benchmark(count, runs):
+    """Prints the cold first-load time of `count` thought records from JSON and from a snapshot."""
+    base_dir = tempfile.mkdtemp(prefix="snapshot-benchmark-")
+    try:
+        with open(os.path.join(base_dir, "thought_records.json"), 'w') as f:
+            json.dump(make_thought_records(count), f, indent=4)
+        json_time = time_first_load(base_dir, False, runs)
+        data_manager = DataManager(base_dir, snapshots=True)
+        data_manager.get_all_thought_records()
+        data_manager.flush() # Writes the snapshot
+        snapshot_time = time_first_load(base_dir, True, runs)
+        json_size = os.path.getsize(data_manager.thought_records_file)
+        snapshot_size = os.path.getsize(data_manager._snapshot_path(data_manager.thought_records_file))
+        print(f"{count:>7} records  JSON {json_time * 1000:8.1f} ms ({json_size / 1e6:5.1f} MB)   "
+              f"snapshot {snapshot_time * 1000:8.1f} ms ({snapshot_size / 1e6:5.1f} MB)   "
+              f"{json_time / snapshot_time:4.1f}x faster (median of {runs})")
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    # Usage: python snapshot_benchmark.py [runs]
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for count in SIZES:
+        benchmark(count, runs)
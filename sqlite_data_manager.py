@@ -0,0 +1,344 @@
+# sqlite_data_manager.py
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from change_events import ADDED, UPDATED, DELETED, BULK_CHANGED, EXTERNALLY_RELOADED
+from columnar import NumericColumns
+from data_manager import DataManager, read_json_list
+from records import json_default
+
+class SQLiteDataManager(DataManager):
+    """
+    A DataManager that stores every record type in its own SQLite table instead of a JSON file.
+    All public methods of DataManager are kept, so pages can use either class interchangeably.
+
+    Each table keeps the full record as JSON in the 'data' column, plus the two fields we look
+    records up by: 'creation_timestamp' (unique index) and the record's date (indexed).
+    Every write runs in its own transaction, so a crash can never leave a half-written collection.
+    """
+    def __init__(self, base_dir="data", db_filename="mindsync.db"):
+        os.makedirs(base_dir, exist_ok=True)
+        self.db_path = os.path.join(base_dir, db_filename)
+        # The connection is shared with background threads, so access is serialized with a lock
+        self._db_lock = threading.RLock()
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Changes whenever another connection commits, so outside changes bump the collection versions
+        self._data_version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        # The base class calls _initialize_file for each collection, which creates its table
+        super().__init__(base_dir)
+        # The search index is kept in memory only: it is rebuilt from the tables on the first search
+        self.search_index_file = None
+        self._search_versions = {} # Collection file path -> version the search index was last synced at
+        self._statistics = {} # Collection file path -> (version, stats), rebuilt when the version changes
+        self._activity_columns = None # (version, NumericColumns) of the activities, rebuilt when the version changes
+
+    def preload(self, collections=None, processes=False):
+        """A no-op: records are read from the database on demand, and there is no record cache to fill."""
+
+    def close(self):
+        """Closes the database connection."""
+        with self._db_lock:
+            self._connection.close()
+
+    def _table_name(self, filepath):
+        """Maps a collection's JSON file path to its table name (e.g. 'thought_records')."""
+        return os.path.splitext(os.path.basename(filepath))[0]
+
+    def _initialize_file(self, file_path):
+        """Ensures the table and indexes for a collection exist."""
+        table = self._table_name(file_path)
+        with self._db_lock, self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "creation_timestamp TEXT UNIQUE, "
+                "record_date TEXT, "
+                "data TEXT NOT NULL)"
+            )
+            # Covers query()'s whole ORDER BY, so a LIMIT stops early without sorting.
+            # Replaces the record_date-only index of older databases.
+            self._connection.execute(f"DROP INDEX IF EXISTS idx_{table}_record_date")
+            self._connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_record_date_timestamp ON {table} (record_date, creation_timestamp)")
+
+    def _row_values(self, filepath, record):
+        """Returns the (creation_timestamp, record_date, data) column values for a record."""
+        date_field = self._date_fields[filepath]
+        return (record.get("creation_timestamp"), record.get(date_field), json.dumps(record, default=json_default))
+
+    def _load_data(self, filepath):
+        """Loads all records of a collection in insertion order."""
+        table = self._table_name(filepath)
+        try:
+            with self._db_lock:
+                rows = self._connection.execute(f"SELECT data FROM {table} ORDER BY id").fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading {table} from {self.db_path}: {e}. Returning empty list.")
+            return []
+        return [self._make_record(filepath, json.loads(row[0])) for row in rows]
+
+    def _save_data(self, filepath, data):
+        """Replaces the whole collection with `data` in a single transaction."""
+        table = self._table_name(filepath)
+        try:
+            with self._db_lock, self._connection:
+                self._connection.execute(f"DELETE FROM {table}")
+                self._connection.executemany(
+                    f"INSERT INTO {table} (creation_timestamp, record_date, data) VALUES (?, ?, ?)",
+                    [self._row_values(filepath, record) for record in data],
+                )
+        except sqlite3.Error as e:
+            print(f"Error saving data to {table} in {self.db_path}: {e}")
+            return
+        self._notify(BULK_CHANGED, filepath)
+
+    def _get_record_by_timestamp(self, filepath, record_timestamp):
+        """Fetches a single record through the creation_timestamp index."""
+        table = self._table_name(filepath)
+        with self._db_lock:
+            row = self._connection.execute(
+                f"SELECT data FROM {table} WHERE creation_timestamp = ?", (record_timestamp,)
+            ).fetchone()
+        return self._make_record(filepath, json.loads(row[0])).copy() if row else None
+
+    def _add_records(self, filepath, records):
+        """
+        Inserts new records in a single transaction. Returns their creation_timestamps, with None
+        for a record whose creation_timestamp is already taken, and all None if the transaction failed.
+        """
+        records = [self._add_creation_timestamp(record_data) for record_data in records]
+        table = self._table_name(filepath)
+        results = []
+        added = []
+        try:
+            with self._db_lock, self._connection:
+                for record_data in records:
+                    try:
+                        self._connection.execute(
+                            f"INSERT INTO {table} (creation_timestamp, record_date, data) VALUES (?, ?, ?)",
+                            self._row_values(filepath, record_data),
+                        )
+                    except sqlite3.IntegrityError: # Only this row is rolled back; the None reports it
+                        results.append(None)
+                        continue
+                    results.append(record_data["creation_timestamp"])
+                    added.append(record_data)
+        except sqlite3.Error as e:
+            print(f"Error adding records to {table} in {self.db_path}: {e}")
+            return [None] * len(records)
+        if added:
+            self._notify(ADDED, filepath, [record_data["creation_timestamp"] for record_data in added])
+            self._update_search(filepath, records=added)
+        return results
+
+    def _update_records_by_timestamp(self, filepath, updates):
+        """
+        Updates records in place through the creation_timestamp index, in a single transaction.
+        Returns a list of booleans telling whether each record was found and updated.
+        """
+        table = self._table_name(filepath)
+        updates = list(updates)
+        results = []
+        try:
+            with self._db_lock, self._connection:
+                for record_timestamp, updated_data in updates:
+                    updated_data["creation_timestamp"] = record_timestamp
+                    _, record_date, data = self._row_values(filepath, updated_data)
+                    cursor = self._connection.execute(
+                        f"UPDATE {table} SET record_date = ?, data = ? WHERE creation_timestamp = ?",
+                        (record_date, data, record_timestamp),
+                    )
+                    results.append(cursor.rowcount > 0)
+        except sqlite3.Error as e:
+            print(f"Error updating records in {table} in {self.db_path}: {e}")
+            return [False] * len(updates)
+        if any(results):
+            self._notify(UPDATED, filepath, [record_timestamp for (record_timestamp, _), found in zip(updates, results) if found])
+            self._update_search(filepath, records=[updated_data for (_, updated_data), found in zip(updates, results) if found])
+        return results
+
+    def _delete_records_by_timestamp(self, filepath, record_timestamps):
+        """
+        Deletes records through the creation_timestamp index, in a single transaction.
+        Returns a list of booleans telling whether each record was found and deleted.
+        """
+        record_timestamps = list(record_timestamps)
+        table = self._table_name(filepath)
+        results = []
+        try:
+            with self._db_lock, self._connection:
+                for record_timestamp in record_timestamps:
+                    cursor = self._connection.execute(f"DELETE FROM {table} WHERE creation_timestamp = ?", (record_timestamp,))
+                    results.append(cursor.rowcount > 0)
+        except sqlite3.Error as e:
+            print(f"Error deleting records from {table} in {self.db_path}: {e}")
+            return [False] * len(record_timestamps)
+        if any(results):
+            self._notify(DELETED, filepath, [record_timestamp for record_timestamp, found in zip(record_timestamps, results) if found])
+            self._update_search(filepath, removed=[record_timestamp for record_timestamp, found in zip(record_timestamps, results) if found])
+        return results
+
+    def get_collection_version(self, collection):
+        """
+        Change counter of a collection (see DataManager.get_collection_version). Commits made by
+        other connections are detected through PRAGMA data_version and bump every collection.
+        """
+        filepath = self._collection_path(collection)
+        with self._db_lock:
+            data_version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+            changed = data_version != self._data_version
+            self._data_version = data_version
+        if changed: # Published outside _db_lock, which is always taken after the base class lock
+            for path in self._collection_files.values():
+                self._notify(EXTERNALLY_RELOADED, path)
+        return self._versions.get(filepath, 0)
+
+    # --- Columnar numeric views ---
+    def get_behavioral_activation_columns(self):
+        """
+        The activity ratings as NumericColumns (see DataManager.get_behavioral_activation_columns).
+        Without a record cache to update them from, they are rebuilt from the table whenever the
+        collection changed.
+        """
+        filepath = self.behavioral_activation_file
+        with self._lock:
+            version = self.get_collection_version(self._collection_names[filepath])
+            cached = self._activity_columns
+            if cached is None or cached[0] != version:
+                records = self._load_data(filepath)
+                columns = NumericColumns(self._date_fields[filepath], self.BA_NUMERIC_FIELDS,
+                                         ((record.get("creation_timestamp"), record) for record in records))
+                cached = self._activity_columns = (version, columns)
+            return cached[1]
+
+    # --- Running statistics ---
+    def get_statistics(self, collection):
+        """
+        Statistics of a collection (see DataManager.get_statistics). Without a record cache to
+        update them from, they are recomputed from the table whenever the collection changed.
+        """
+        filepath = self._collection_path(collection)
+        with self._lock:
+            version = self.get_collection_version(collection)
+            cached = self._statistics.get(filepath)
+            if cached is None or cached[0] != version:
+                cached = self._statistics[filepath] = (version, self._build_statistics(filepath, self._load_data(filepath)))
+            return cached[1]
+
+    def rebuild_statistics(self, collection):
+        filepath = self._collection_path(collection)
+        with self._lock:
+            self._statistics.pop(filepath, None)
+            return self.get_statistics(collection)
+
+    # --- Full-text search ---
+    def _sync_search(self, filepath):
+        """Re-indexes a collection for search() if it changed since it was last indexed."""
+        collection = self._collection_names[filepath]
+        with self._lock:
+            version = self.get_collection_version(collection)
+            if self._search_versions.get(filepath) == version:
+                return
+            records = self._load_data(filepath)
+            self._search_index().rebuild(collection, ((record.get("creation_timestamp"), record) for record in records))
+            self._search_versions[filepath] = version
+
+    def _update_search(self, filepath, records=(), removed=()):
+        """Applies a write made through this manager to the search index, if it was built."""
+        collection = self._collection_names[filepath]
+        with self._lock:
+            if filepath not in self._search_versions:
+                return
+            for record_timestamp in removed:
+                self._search.remove(collection, record_timestamp)
+            for record in records:
+                self._search.add(collection, record["creation_timestamp"], record)
+            # Only up to date if nothing else (e.g. another connection) changed the table meanwhile
+            if self._search_versions[filepath] == self._versions.get(filepath, 0) - 1:
+                self._search_versions[filepath] = self._versions[filepath]
+            else:
+                del self._search_versions[filepath]
+
+    def _search_record(self, filepath, key):
+        return self._get_record_by_timestamp(filepath, key)
+
+
+    def query(self, collection, start_date=None, end_date=None, limit=None, order="asc"):
+        """Date-range query answered by the record_date index (see DataManager.query)."""
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Unknown order '{order}'. Expected 'asc' or 'desc'.")
+        filepath = self._collection_path(collection)
+        table = self._table_name(filepath)
+        conditions = []
+        parameters = []
+        if start_date is not None:
+            conditions.append("record_date >= ?")
+            parameters.append(self._date_bound(start_date))
+        if end_date is not None:
+            conditions.append("record_date <= ?")
+            parameters.append(self._date_bound(end_date) + "\uffff") # Includes timestamps on the end date
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        direction = "ASC" if order == "asc" else "DESC"
+        sql = f"SELECT data FROM {table} {where} ORDER BY record_date {direction}, creation_timestamp {direction}" # NULL dates sort first, as in DataManager.query
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(max(limit, 0))
+        with self._db_lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        return [self._make_record(filepath, json.loads(row[0])) for row in rows]
+
+
+    # --- One-shot import from the JSON files ---
+    def import_json_files(self, json_dir=None, force=False):
+        """
+        Imports the three JSON files written by DataManager into the database.
+        Runs only once per database unless `force` is True, in which case existing rows are replaced.
+        Returns a dict mapping table name to the number of imported records.
+        """
+        json_dir = json_dir or self.base_dir
+        with self._db_lock:
+            already_imported = self._connection.execute("SELECT value FROM meta WHERE key = 'json_imported'").fetchone()
+        if already_imported and not force:
+            print(f"JSON data was already imported into {self.db_path}; skipping.")
+            return {}
+
+        imported = {}
+        imported_paths = []
+        try:
+            with self._db_lock, self._connection:
+                for filepath in (self.thought_records_file, self.behavioral_activation_file, self.problem_solving_records_file):
+                    table = self._table_name(filepath)
+                    json_path = os.path.join(json_dir, os.path.basename(filepath))
+                    records = read_json_list(json_path, "Skipping it.") or []
+                    if force:
+                        self._connection.execute(f"DELETE FROM {table}")
+                    self._connection.executemany(
+                        f"INSERT OR REPLACE INTO {table} (creation_timestamp, record_date, data) VALUES (?, ?, ?)",
+                        [self._row_values(filepath, record) for record in records],
+                    )
+                    imported[table] = len(records)
+                    imported_paths.append(filepath)
+                self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', '1')")
+        except sqlite3.Error as e:
+            print(f"Error importing JSON data into {self.db_path}: {e}")
+            return {}
+        for filepath in imported_paths:
+            self._notify(BULK_CHANGED, filepath)
+        return imported
+
+
+if __name__ == "__main__":
+    # Usage: python sqlite_data_manager.py [data_dir]
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data"
+    manager = SQLiteDataManager(data_dir)
+    counts = manager.import_json_files()
+    for table, count in counts.items():
+        print(f"Imported {count} records into '{table}'.")
+    manager.close()
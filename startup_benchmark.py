@@ -0,0 +1,51 @@
+# startup_benchmark.py
+
+import os
+import statistics
+import subprocess
+import sys
+
+# The plotting stack ProgressPage imports when the Activity Trends tab is first shown
+PLOTTING_IMPORTS = (
+    "import numpy, matplotlib.dates, matplotlib.collections, matplotlib.figure, "
+    "matplotlib.backends.backend_tkagg"
+)
+
+SCENARIOS = (
+    ("import app (cold start)", "import app"),
+    ("import app + plotting stack (first Trends view)", f"import app; {PLOTTING_IMPORTS}"),
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__)) # The app's modules are imported from here
+
+def time_import(statement, runs=7, setup=""):
+    """
+    Runs `statement` in fresh interpreters and returns the median wall time in seconds.
+    A new process per run means nothing is already in sys.modules, like a real cold start
+    (the OS file cache is warm after the first run, which the median smooths out).
+    `setup` runs first in each interpreter and is not timed.
+    """
+    code = (
+        f"{setup}\nimport time; start = time.perf_counter(); "
+        f"{statement}; "
+        "print(time.perf_counter() - start)"
+    )
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=HERE).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+def loaded_heavy_modules():
+    """Returns which of the heavy third-party packages `import app` pulls in."""
+    code = "import sys, app; print(' '.join(m for m in ('matplotlib', 'numpy', 'pandas') if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=HERE).stdout.split()
+
+
+if __name__ == "__main__":
+    # Usage: python startup_benchmark.py [runs]
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    for label, statement in SCENARIOS:
+        print(f"{label:<50} {time_import(statement, runs) * 1000:8.1f} ms (median of {runs})")
+    heavy = loaded_heavy_modules()
+    print(f"Heavy modules loaded by 'import app': {', '.join(heavy) if heavy else 'none'}")
@@ -16,6 +16,7 @@ class ThoughtRecordPage(ttk.Frame):
 
         # Dictionary to store collected data temporarily
         self.record_data = {}
+        self.record_timestamp = None # To store timestamp if editing an existing record
         # List to store selected emotions and their initial/final labels
         self.selected_emotions = {} # {emotion_name: {'initial_var': IntVar, 'final_var': IntVar}}
 
@@ -446,10 +447,19 @@ class ThoughtRecordPage(ttk.Frame):
         if self._validate_step(self.total_steps - 1): # Validate the last step before saving
             self._collect_data_for_step(self.total_steps - 1) # Collect data from the last step
 
-            self.data_manager.add_thought_record(self.record_data)
-            messagebox.showinfo("Success", "Thought Record saved successfully!")
-            self._clear_form() # Reset the form
-            self.controller.show_frame("ProgressPage") # Go to progress page to see the new record
+            if self.record_timestamp: # Editing an existing record: update it in place
+                success = self.data_manager.update_thought_record(self.record_timestamp, self.record_data)
+                action, action_word = "update", "updated"
+            else:
+                success = self.data_manager.add_thought_record(self.record_data)
+                action, action_word = "save", "saved"
+
+            if success:
+                messagebox.showinfo("Success", f"Thought Record {action_word} successfully!")
+                self._clear_form() # Reset the form
+                self.controller.show_frame("ProgressPage") # Go to progress page to see the changes
+            else:
+                messagebox.showerror("Error", f"Failed to {action} Thought Record. Please try again.")
 
     def _clear_form(self):
         self.date_entry.set_date(datetime.date.today())
@@ -477,6 +487,7 @@ class ThoughtRecordPage(ttk.Frame):
             widget.destroy()
 
         self.record_data = {} # Clear stored data
+        self.record_timestamp = None # Back to new record mode
         self.current_step = 0
         self._show_step(self.current_step) # Go back to the first step
 
@@ -527,9 +538,7 @@ class ThoughtRecordPage(ttk.Frame):
                 if emotion in final_emotions_data:
                     initial_var_dict['final_var'].set(final_emotions_data[emotion])
 
-            self.record_timestamp = record_timestamp # Store for update operation
-            # You would need to change the submit button to "Update" and modify _save_record logic
-            # to call update_thought_record instead of add_thought_record.
+            self.record_timestamp = record_timestamp # Store for update operation (see _save_record)
             # For a multi-step edit, you might want to show the first step and let the user navigate.
             self.current_step = 0
             self._show_step(self.current_step)
@@ -0,0 +1,248 @@
+# virtual_treeview.py
+
+from tkinter import ttk
+
+class VirtualTreeview(ttk.Frame):
+    """
+    A Treeview that only materializes the rows in its viewport.
+
+    The model is a list of row ids (e.g. 'creation_timestamp's); row_values(row_id) returns the
+    tuple of column values for one row and is only called for rows that are on screen.
+    The underlying ttk.Treeview holds a fixed pool of item slots, one per visible line. Scrolling
+    just rewrites the values of those slots, so the number of Tk calls depends on the window
+    height, not on how many rows the model has.
+    Selection is kept by row id (so it survives scrolling) and follows the usual click,
+    Ctrl+click, Shift+click and arrow-key behaviour.
+    """
+    def __init__(self, parent, columns, row_values, selectmode="extended"):
+        super().__init__(parent)
+        self.row_values = row_values
+        self.selectmode = selectmode
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", selectmode="none")
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self._row_ids = [] # Model order
+        self._positions = None # row id -> position in _row_ids, built on demand
+        self._first = 0 # Position of the row shown in the top slot
+        self._slots = [] # Treeview item ids of the recycled slots
+        self._slot_rows = [] # Row id currently rendered in each slot (None if the slot is detached)
+        self._stale_slots = set() # Slots whose values must be rewritten even if their row id is unchanged
+        self._selected = set()
+        self._anchor = None # Position Shift+click/Shift+arrow ranges start from
+        self._cursor = None # Position of the last clicked or keyed row
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<Control-Button-1>", lambda event: self._on_click(event, toggle=True))
+        self.tree.bind("<Shift-Button-1>", lambda event: self._on_click(event, extend=True))
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        for sequence, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                               ("<Home>", "home"), ("<End>", "end")):
+            self.tree.bind(sequence, lambda event, step=step: self._on_key(step))
+            self.tree.bind(f"<Shift-{sequence[1:]}", lambda event, step=step: self._on_key(step, extend=True))
+        self.tree.bind("<Control-a>", lambda event: (self.selection_set(self._row_ids), "break")[1])
+
+    # --- Treeview passthroughs ---
+    def heading(self, column, option=None, **kwargs):
+        return self.tree.heading(column, option, **kwargs)
+
+    def column(self, column, **kwargs):
+        return self.tree.column(column, **kwargs)
+
+    # --- Model ---
+    def set_rows(self, row_ids, changed=None):
+        """
+        Replaces the rows shown (in display order). Selection is kept for rows still present.
+        `changed` lists the rows whose values changed; only those (and slots now showing a
+        different row) are rewritten. By default every visible row is rewritten.
+        """
+        row_ids = list(row_ids)
+        if row_ids != self._row_ids:
+            self._row_ids = row_ids
+            self._positions = None
+            self._selected &= set(row_ids)
+            self._anchor = self._cursor = None
+            self._first = max(0, min(self._first, len(self._row_ids) - len(self._slots)))
+        if changed is None:
+            self._stale_slots.update(range(len(self._slots)))
+        else:
+            changed = set(changed)
+            self._stale_slots.update(index for index, row_id in enumerate(self._slot_rows) if row_id in changed)
+        self._render()
+
+    def delete_rows(self, row_ids):
+        """Removes rows from the view, keeping the scroll position and the rest of the selection."""
+        row_ids = set(row_ids)
+        self.set_rows([row_id for row_id in self._row_ids if row_id not in row_ids], changed=())
+
+    def refresh_rows(self, row_ids=None):
+        """Re-renders the given rows (all visible rows by default) after their values changed."""
+        row_ids = None if row_ids is None else set(row_ids)
+        for index, row_id in enumerate(self._slot_rows):
+            if row_id is not None and (row_ids is None or row_id in row_ids):
+                self._stale_slots.add(index)
+        self._render()
+
+    def get_rows(self):
+        """Returns the row ids in display order."""
+        return list(self._row_ids)
+
+    def _position(self, row_id):
+        if self._positions is None:
+            self._positions = {row: position for position, row in enumerate(self._row_ids)}
+        return self._positions.get(row_id)
+
+    # --- Selection ---
+    def selection(self):
+        """Returns the selected row ids, in display order."""
+        if not self._selected:
+            return ()
+        return tuple(sorted(self._selected, key=self._position))
+
+    def selection_set(self, row_ids):
+        """Selects exactly the given rows."""
+        self._selected = set(row_ids) & set(self._row_ids)
+        self._render_selection()
+
+    def see(self, row_id):
+        """Scrolls so that a row is visible."""
+        position = self._position(row_id)
+        if position is None:
+            return
+        if position < self._first:
+            self._scroll_to(position)
+        elif position >= self._first + len(self._slots):
+            self._scroll_to(position - len(self._slots) + 1)
+
+    # --- Rendering ---
+    def _visible_count(self):
+        """Number of whole rows that fit in the Treeview's current height."""
+        height = self.tree.winfo_height()
+        if height <= 1: # Not mapped yet
+            return 0
+        header, row_height = 0, 0
+        if self._slots:
+            bbox = self.tree.bbox(self._slots[0])
+            if bbox:
+                header, row_height = bbox[1], bbox[3]
+        if not row_height:
+            style = ttk.Style(self)
+            row_height = int(style.lookup("Treeview", "rowheight") or 20)
+            header = header or row_height + 4
+        return max(1, (height - header) // row_height)
+
+    def _on_resize(self, event=None):
+        count = self._visible_count()
+        while len(self._slots) < count:
+            slot = self.tree.insert("", "end", values=())
+            self.tree.detach(slot) # Attached once it has a row to show
+            self._slots.append(slot)
+            self._slot_rows.append(None)
+        while len(self._slots) > count:
+            self.tree.delete(self._slots.pop())
+            self._slot_rows.pop()
+            self._stale_slots.discard(len(self._slots))
+        self._first = max(0, min(self._first, len(self._row_ids) - len(self._slots)))
+        self._render()
+
+    def _render(self):
+        """Writes the rows in the viewport into the slots, touching only slots whose row changed."""
+        for index, slot in enumerate(self._slots):
+            position = self._first + index
+            row_id = self._row_ids[position] if position < len(self._row_ids) else None
+            if row_id == self._slot_rows[index] and index not in self._stale_slots:
+                continue
+            if row_id is None:
+                if self._slot_rows[index] is not None:
+                    self.tree.detach(slot)
+            else:
+                if self._slot_rows[index] is None:
+                    self.tree.move(slot, "", index) # Reattach a detached slot in place
+                self.tree.item(slot, values=self.row_values(row_id))
+            self._slot_rows[index] = row_id
+        self._stale_slots.clear()
+        self._render_selection()
+        total = len(self._row_ids)
+        if total:
+            self.scrollbar.set(self._first / total, min(1.0, (self._first + len(self._slots)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _render_selection(self):
+        selected_slots = [slot for slot, row_id in zip(self._slots, self._slot_rows)
+                          if row_id is not None and row_id in self._selected]
+        self.tree.selection_set(selected_slots)
+
+    # --- Scrolling ---
+    def _scroll_to(self, first):
+        first = max(0, min(first, len(self._row_ids) - len(self._slots)))
+        if first != self._first:
+            self._first = first
+            self._render()
+
+    def scroll(self, rows):
+        """Scrolls by a number of rows (negative scrolls up)."""
+        self._scroll_to(self._first + rows)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * len(self._row_ids)))
+        elif action == "scroll":
+            step = len(self._slots) if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    # --- Mouse and keyboard selection ---
+    def _on_click(self, event, toggle=False, extend=False):
+        if self.tree.identify_region(event.x, event.y) not in ("cell", "tree"):
+            return None # Headings and separators keep their default behaviour
+        slot = self.tree.identify_row(event.y)
+        if slot not in self._slots or self._first + self._slots.index(slot) >= len(self._row_ids):
+            return "break"
+        position = self._first + self._slots.index(slot)
+        self.tree.focus_set()
+        self._select_position(position, toggle=toggle, extend=extend)
+        return "break"
+
+    def _on_key(self, step, extend=False):
+        if not self._row_ids:
+            return "break"
+        current = self._cursor if self._cursor is not None else self._first
+        if step == "home":
+            target = 0
+        elif step == "end":
+            target = len(self._row_ids) - 1
+        elif step in ("page", "-page"):
+            page = max(1, len(self._slots) - 1)
+            target = current + (page if step == "page" else -page)
+        else:
+            target = current + step
+        target = max(0, min(target, len(self._row_ids) - 1))
+        self._select_position(target, extend=extend)
+        self.see(self._row_ids[target])
+        return "break"
+
+    def _select_position(self, position, toggle=False, extend=False):
+        row_id = self._row_ids[position]
+        if self.selectmode == "extended" and extend and self._anchor is not None:
+            low, high = sorted((self._anchor, position))
+            self._selected = set(self._row_ids[low:high + 1])
+        elif self.selectmode == "extended" and toggle:
+            self._selected ^= {row_id}
+        else:
+            self._selected = {row_id}
+        if not extend or self._anchor is None:
+            self._anchor = position
+        self._cursor = position
+        self._render_selection()
+        self.event_generate("<<TreeviewSelect>>")